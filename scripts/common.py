@@ -1,13 +1,10 @@
-from pathlib import Path
-
-from steam_api.client import client
+from steam_api.client import NotFound, client
 
 
 def handle_empty_game_info(app_id):
-    cache = client.get_app_info.cache.cache_backend
-    if not cache[app_id]:
-        f: Path = cache._key_file(app_id)
-        if f.exists():
-            f.unlink()
-    else:
+    decorator = client.get_app_info.cache
+    key = decorator.key(client, app_id)
+    if decorator.cache_backend[key]:
         raise AssertionError(app_id)
+    # remember the app as missing instead of asking for it on every run
+    decorator.remember_error(key, NotFound(f'app {app_id} empty data'))
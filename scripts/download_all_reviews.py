@@ -1,8 +1,17 @@
+import argparse
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from scripts.common import handle_empty_game_info
+from steam_api.app_infos import iter_app_infos
 from steam_api.client import NotFound, client
 from steam_api.config import config
+from steam_api.endpoints import REVIEWS_PER_PAGE
+from steam_api.schemas import App, OwnedGame
+
+PROGRESS_INTERVAL = 1
 
 
 def check_stop() -> bool:
@@ -13,30 +22,114 @@ def check_stop() -> bool:
     return False
 
 
-def download_reviews():
+class Progress:
+    def __init__(self, apps: int, total_reviews: int):
+        self.apps = apps
+        self.total_reviews = total_reviews
+        self.apps_done = 0
+        self.pages = 0
+        self.reviews = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def review(self, new_page: bool) -> None:
+        with self._lock:
+            self.reviews += 1
+            self.pages += new_page
+
+    def app_done(self, app_id: int, name: str, reviews: int, expected: int) -> None:
+        with self._lock:
+            self.apps_done += 1
+            # keep ETA honest when the summary was off
+            self.total_reviews += reviews - expected
+        print(f'\r{app_id} {name or "UNKNOWN"}: {reviews} reviews\033[K')
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self._started
+        pages_rate = self.pages / elapsed
+        reviews_rate = self.reviews / elapsed
+        left = max(self.total_reviews - self.reviews, 0)
+        eta = (
+            time.strftime('%H:%M:%S', time.gmtime(left / reviews_rate))
+            if reviews_rate
+            else '--:--:--'
+        )
+        return (
+            f'apps {self.apps_done}/{self.apps}'
+            f' | reviews {self.reviews}/{self.total_reviews}'
+            f' | {pages_rate:.1f} pages/s, {reviews_rate:.0f} reviews/s'
+            f' | ETA {eta}'
+        )
+
+
+def prepare(game: OwnedGame, app_info: App | NotFound) -> tuple[int, str, int] | None:
+    if isinstance(app_info, NotFound):
+        print('NOT FOUND:', str(app_info))
+        return None
+    total_reviews = client.get_total_reviews(game.id)
+    if not app_info:
+        handle_empty_game_info(game.id)
+        return None
+    if game.id in client.get_reviews.cache:
+        return None
+    return game.id, app_info.name, total_reviews or 0
+
+
+def download_app(  # pylint:disable=too-many-arguments
+    app_id: int, name: str, expected: int, progress: Progress, stop: threading.Event
+) -> None:
+    if stop.is_set():
+        return
+    reviews = 0
+    for reviews, _ in enumerate(client.get_reviews(app_id), start=1):
+        progress.review(new_page=reviews % REVIEWS_PER_PAGE == 1)
+    progress.app_done(app_id, name, reviews, expected)
+
+
+def download_reviews(workers: int = 1):
     games = client.get_player_owned_games(config.STEAM_MY_ID).games
     games = sorted(games, key=lambda game: -game.playtime_forever)
-    for game in games[::-1]:
-        try:
-            app_info = client.get_app_info(game.id)
-        except NotFound as e:
-            print('NOT FOUND:', str(e))
-            continue
-        total_reviews = client.get_total_reviews(game.id)
-        if not app_info:
-            handle_empty_game_info(game.id)
-            continue
-        print(app_info.id, app_info.name or 'UNKNOWN', total_reviews)
-
-        if game.id in client.get_reviews.cache.cache_backend:
-            continue
-        for i, r in enumerate(client.get_reviews(game.id), start=1):
-            if not i % 10:
-                print(f'\r{i}/{total_reviews}', end='')
-        print('')
-        if check_stop():
-            break
+    stop = threading.Event()
+    # only names are printed: the rest of the app infos is not loaded
+    app_infos = dict(
+        iter_app_infos(client, (game.id for game in games), fields={'name'})
+    )
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        queue = [
+            item
+            for item in pool.map(
+                prepare, games[::-1], [app_infos[game.id] for game in games[::-1]]
+            )
+            if item
+        ]
+        progress = Progress(len(queue), sum(total for *_, total in queue))
+        pending: set[Future] = {
+            pool.submit(download_app, app_id, name, total, progress, stop)
+            for app_id, name, total in queue
+        }
+        while pending:
+            done, pending = wait(
+                pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                try:
+                    future.result()
+                except Exception:
+                    # queued apps are dropped, only those in flight are finished
+                    stop.set()
+                    pool.shutdown(cancel_futures=True)
+                    raise
+            print(f'\r{progress.line()}\033[K', end='')
+            if not stop.is_set() and check_stop():
+                # graceful drain: apps in flight are finished, queued ones are skipped
+                stop.set()
+                print('\rstop requested, draining\033[K')
+    print('')
 
 
 if __name__ == '__main__':
-    download_reviews()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-w', '--workers', type=int, default=4, help='apps downloaded concurrently'
+    )
+    download_reviews(workers=parser.parse_args().workers)
@@ -0,0 +1,5 @@
+from steam_api.models import get_app_name_map
+
+if __name__ == '__main__':
+    # names of games bought since the last run resolve to them from now on
+    get_app_name_map().rebuild()
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Iterable, Iterator, cast
+
+from steam_api.cache.entries import CachedError
+from steam_api.cache.memory import MISSING
+from steam_api.client import Client, NotFound
+from steam_api.schemas import App
+
+# bulk app info: apps per task, tasks in parallel
+APP_INFO_CHUNK = 10
+APP_INFO_WORKERS = 8
+
+
+def iter_app_infos(
+    client: Client,
+    app_ids: Iterable[int],
+    chunk_size: int = APP_INFO_CHUNK,
+    workers: int = APP_INFO_WORKERS,
+    fields: Iterable[str] | None = None,
+) -> Iterator[tuple[int, App | NotFound]]:
+    """`(app_id, app)` pairs as they are ready, NotFound errors in place of apps.
+
+    Cached apps come first, the rest is fetched by chunks in parallel under
+    the rate limiter of `client` and cached as by `get_app_info`. appdetails
+    answers one app per request: chunks only group the work of a thread.
+    With `fields` apps are projections, as with `get_app_info`.
+    """
+    stored = client.get_app_info.cache  # type: ignore[attr-defined]
+    missing = []
+    for app_id in app_ids:
+        result = stored.cached(client, app_id, fields=fields)
+        if result is MISSING:
+            missing.append(app_id)
+        elif isinstance(result, CachedError):
+            yield app_id, cast(NotFound, result.error)
+        else:
+            yield app_id, cast(App, result)
+    if not missing:
+        return
+    chunks = [missing[i : i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    pool = ThreadPoolExecutor(workers, thread_name_prefix='app_info')
+    try:
+        futures = [
+            pool.submit(_get_app_infos, client, chunk, fields) for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        # a consumer that stops early does not wait for the queued chunks
+        pool.shutdown(cancel_futures=True)
+
+
+def get_app_infos(
+    client: Client, app_ids: Iterable[int], **kwargs: Any
+) -> dict[int, App]:
+    """Apps by id, see `iter_app_infos`; apps not found are left out"""
+    return {
+        app_id: app
+        for app_id, app in iter_app_infos(client, app_ids, **kwargs)
+        if not isinstance(app, NotFound)
+    }
+
+
+def _get_app_infos(
+    client: Client, app_ids: list[int], fields: Iterable[str] | None
+) -> list[tuple[int, App | NotFound]]:
+    results: list[tuple[int, App | NotFound]] = []
+    # pylint:disable=unexpected-keyword-arg
+    for app_id in app_ids:
+        try:
+            app = client.get_app_info(app_id, fields=fields)  # type: ignore[call-arg]
+            results.append((app_id, app))
+        except NotFound as e:
+            results.append((app_id, e))
+    return results
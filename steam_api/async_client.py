@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Self, TypeVar
+
+from steam_api.cache import Checkpoint, cache
+from steam_api.client import (
+    APP_NOT_FOUND_TTL,
+    OWNED_GAMES_TTL,
+    SUMMARY_TTL,
+    Client,
+    NotFound,
+    is_known,
+    unique_reviews,
+)
+from steam_api.common import AnyDict
+from steam_api.ratelimit import RateLimiter
+from steam_api.schemas import App, OwnedGamesResponse, Review, ReviewsSummary
+
+CONCURRENCY = 16
+
+T = TypeVar('T')
+
+
+class AsyncClient:
+    """asyncio facade over `Client`.
+
+    Requests go through the pooled sessions of a wrapped `Client`, executed on a
+    dedicated thread pool; the semaphore caps the number of requests in flight.
+    Results share cache entries with the sync client.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        concurrency: int = CONCURRENCY,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self._client = Client(api_key, pool_size=concurrency, rate_limiter=rate_limiter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='steam_api'
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _call(self, func: Callable[..., T], *args: Any) -> T:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self._client.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        # waits for requests still running on the pool
+        await asyncio.to_thread(self.close)
+
+    @cache(
+        'get_app_info',
+        model=App,
+        negative=(NotFound,),
+        negative_ttl=APP_NOT_FOUND_TTL,
+        trusted=True,
+    )
+    async def get_app_info(self, app_id: int, validators: AnyDict | None = None) -> App:
+        return await self._call(self._client.endpoints.app_info, app_id, validators)
+
+    async def get_app_infos(self, app_ids: Iterable[int]) -> dict[int, App]:
+        """Apps by id, fetched concurrently; apps not found are left out"""
+        app_ids = list(app_ids)
+        results = await asyncio.gather(
+            *(self.get_app_info(app_id) for app_id in app_ids), return_exceptions=True
+        )
+        apps = {}
+        for app_id, result in zip(app_ids, results):
+            if isinstance(result, NotFound):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            apps[app_id] = result
+        return apps
+
+    @cache(
+        'player_owned_games',
+        OwnedGamesResponse,
+        ttl=OWNED_GAMES_TTL,
+        stale_while_revalidate=True,
+    )
+    async def get_player_owned_games(
+        self, steam_id: int, validators: AnyDict | None = None
+    ) -> OwnedGamesResponse:
+        return await self._call(
+            self._client.endpoints.player_owned_games, steam_id, validators
+        )
+
+    async def get_total_reviews(self, app_id: int) -> int:
+        return (await self.get_review_summary(app_id)).total_reviews
+
+    @cache(
+        'review_summary',
+        model=ReviewsSummary,
+        ttl=SUMMARY_TTL,
+        stale_while_revalidate=True,
+    )
+    async def get_review_summary(self, app_id: int) -> ReviewsSummary:
+        batch = await self._call(self._client.summary_page, app_id)
+        return batch.query_summary
+
+    @cache('reviews', model=Review, trusted=True)
+    async def get_reviews(
+        self,
+        app_id: int,
+        *,
+        resume_from: AnyDict | None = None,
+        since: Review | None = None,
+    ) -> AsyncIterator[Review | Checkpoint]:
+        ids: set[int] = set()
+        cursor = resume_from['cursor'] if resume_from else '*'
+        while cursor:
+            if cursor == '*':
+                batch = await self._call(
+                    self._client.first_review_page, app_id, since is None
+                )
+            else:
+                batch = await self._call(
+                    self._client.endpoints.reviews_page, app_id, cursor
+                )
+            if not batch.reviews:
+                break
+            for review in unique_reviews(batch.reviews, ids):
+                if is_known(review, since):
+                    return
+                yield review
+            cursor = batch.cursor
+            yield Checkpoint({'cursor': cursor})
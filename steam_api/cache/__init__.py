@@ -1,3 +1,5 @@
 from .cacher import Cache, cache
+from .entries import NotModified
+from .streams import Checkpoint
 
-__all__ = ['cache', 'Cache']
+__all__ = ['cache', 'Cache', 'Checkpoint', 'NotModified']
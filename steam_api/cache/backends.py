@@ -1,20 +1,53 @@
 import abc
+import json
+import os
+import threading
+from contextlib import contextmanager
 from functools import cached_property
 from pathlib import Path
-from typing import Callable, Iterator
+from typing import ContextManager, Iterator
 
-from steam_api.cache.serializers import SerializerBase
+from steam_api.cache.serializers import Feed, SerializerBase
 from steam_api.common import AnyDict, AnyJson
+from steam_api.metrics import counter
+
+# values and stream items, as stored: after serialization and compression
+READ_BYTES = counter(
+    'steam_api_cache_read_bytes_total', 'Bytes read from the backend', ('prefix',)
+)
+WRITTEN_BYTES = counter(
+    'steam_api_cache_written_bytes_total', 'Bytes written to the backend', ('prefix',)
+)
+
+
+def _tmp_file(path: Path) -> Path:
+    # one per thread: concurrent writers must not share a half-written file
+    return path.with_name(f'{path.name}.{threading.get_ident()}.tmp')
+
+
+def write_json_atomic(path: Path, data: AnyJson) -> None:
+    tmp = _tmp_file(path)
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
 
 
 class CacheBackend:
+    # whether `written_at` works without meta being recorded (file mtimes)
+    TRACKS_WRITE_TIME = False
+
     def __init__(self, path: Path, serializer: SerializerBase):
         self._path = path
         self._no_args_mode: bool | None = None
         self._serializer = serializer
+        self._read_bytes = READ_BYTES.labels(self.prefix)
+        self._written_bytes = WRITTEN_BYTES.labels(self.prefix)
+
+    @property
+    def prefix(self) -> str:
+        return self._path.name
 
     @cached_property
-    def ext(self):
+    def ext(self) -> str:
         return self._serializer.EXT
 
     @property
@@ -23,11 +56,8 @@ class CacheBackend:
 
     @no_args_mode.setter
     def no_args_mode(self, value: bool) -> None:
-        if value is False:
-            self._path.mkdir(exist_ok=True, parents=True)
-        elif value is True:
-            self._path.parent.mkdir(exist_ok=True, parents=True)
-        else:
+        # set when functions are decorated: directories wait for the first write
+        if not isinstance(value, bool):
             raise TypeError(value)  # pragma: no cover
         self._no_args_mode = value
 
@@ -43,18 +73,45 @@ class CacheBackend:
     def __setitem__(self, key: str, value: AnyJson) -> None:
         ...
 
+    @abc.abstractmethod
+    def get_meta(self, key: str) -> AnyDict:
+        """Bookkeeping stored next to the entry; empty if there is none"""
+
+    @abc.abstractmethod
+    def set_meta(self, key: str, meta: AnyDict) -> None:
+        ...
+
+    def written_at(self, key: str) -> float | None:
+        return self.get_meta(key).get('written_at')
+
+    def touch(self, key: str, written_at: float) -> None:
+        """Mark the entry as written at `written_at`, its value kept"""
+        self.set_meta(key, {**self.get_meta(key), 'written_at': written_at})
+
+    def iter(self, key: str, segments: int = 0) -> Iterator[AnyJson]:
+        """Items of the stream, newest segment first, the base one (0) last"""
+        raise NotImplementedError
+
+    def iter_write(
+        self, key: str, append: bool = False, segment: int = 0
+    ) -> ContextManager[Feed]:
+        raise NotImplementedError
+
 
 class CacheOneFile(CacheBackend):
     def __init__(self, path: Path, serializer: SerializerBase):
         super().__init__(path, serializer)
         self._data: AnyDict | None = None
+        self._meta: AnyDict | None = None
         self._file = self._path.with_suffix('.' + self.ext)
+        self._meta_file = self._path.with_suffix('.meta.json')
 
     @property
     def data(self) -> AnyDict:
         if self._data is None:
             if self._file.exists():
                 self._data = self._serializer.load(self._file)
+                self._read_bytes.inc(self._file.stat().st_size)
             else:
                 self._file.parent.mkdir(exist_ok=True, parents=True)
                 self._data = {}
@@ -69,28 +126,115 @@ class CacheOneFile(CacheBackend):
 
     def __setitem__(self, key: str, value: AnyJson) -> None:
         self.data[key] = value
-        self._serializer.dump(self._file, self.data)
+        # the file holds every key: an interrupted write must not truncate it
+        tmp = _tmp_file(self._file)
+        self._serializer.dump(tmp, self.data)
+        self._written_bytes.inc(tmp.stat().st_size)
+        os.replace(tmp, self._file)
+
+    @property
+    def meta(self) -> AnyDict:
+        if self._meta is None:
+            if self._meta_file.exists():
+                self._meta = json.loads(self._meta_file.read_text())
+            else:
+                self._meta = {}
+        return self._meta
+
+    def get_meta(self, key: str) -> AnyDict:
+        return self.meta.get(key, {})
+
+    def set_meta(self, key: str, meta: AnyDict) -> None:
+        self.meta[key] = meta
+        self._meta_file.parent.mkdir(exist_ok=True, parents=True)
+        write_json_atomic(self._meta_file, self.meta)
 
 
 class CacheFiles(CacheBackend):
-    def _key_file(self, key: str) -> Path:
+    TRACKS_WRITE_TIME = True
+
+    def __init__(self, path: Path, serializer: SerializerBase):
+        super().__init__(path, serializer)
+        self._dir_made = False
+
+    def _writable(self, path: Path) -> Path:
+        if not self._dir_made:
+            path.parent.mkdir(exist_ok=True, parents=True)
+            self._dir_made = True
+        return path
+
+    def _key_file(self, key: str, ext: str | None = None) -> Path:
+        ext = ext or self.ext
         if self._no_args_mode is False:
-            return self._path / f'{key}.{self.ext}'
+            return self._path / f'{key}.{ext}'
         if self._no_args_mode is True:
-            return Path(f'{self._path}.{self.ext}')
+            return Path(f'{self._path}.{ext}')
         raise RuntimeError('mode is not set')  # pragma: no cover
 
+    def _meta_file(self, key: str) -> Path:
+        return self._key_file(key, ext='meta.json')
+
+    def _segment_file(self, key: str, segment: int) -> Path:
+        if not segment:
+            return self._key_file(key)
+        return self._key_file(key, ext=f'{segment}.{self.ext}')
+
     def __contains__(self, key: str) -> bool:
         return self._key_file(key).exists()
 
     def __getitem__(self, key: str) -> AnyJson:
-        return self._serializer.load(self._key_file(key))
+        path = self._key_file(key)
+        value = self._serializer.load(path)
+        self._read_bytes.inc(path.stat().st_size)
+        return value
 
     def __setitem__(self, key: str, value: AnyJson) -> None:
-        self._serializer.dump(self._key_file(key), value)
-
-    def iter(self, key: str) -> Iterator[AnyJson]:
-        return self._serializer.iter(self._key_file(key))
-
-    def iter_write(self, key: str) -> Iterator[Callable[[AnyDict], None]]:
-        return self._serializer.iter_write(self._key_file(key))
+        # readers may race a background refresh: never expose a partial file
+        path = self._writable(self._key_file(key))
+        tmp = _tmp_file(path)
+        self._serializer.dump(tmp, value)
+        self._written_bytes.inc(tmp.stat().st_size)
+        os.replace(tmp, path)
+
+    def get_meta(self, key: str) -> AnyDict:
+        meta_file = self._meta_file(key)
+        if not meta_file.exists():
+            return {}
+        return json.loads(meta_file.read_text())
+
+    def set_meta(self, key: str, meta: AnyDict) -> None:
+        write_json_atomic(self._writable(self._meta_file(key)), meta)
+
+    def written_at(self, key: str) -> float | None:
+        if written_at := super().written_at(key):
+            return written_at
+        try:
+            return self._key_file(key).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def touch(self, key: str, written_at: float) -> None:
+        if 'written_at' in self.get_meta(key):
+            super().touch(key, written_at)
+        else:
+            os.utime(self._key_file(key), (written_at, written_at))
+
+    def iter(self, key: str, segments: int = 0) -> Iterator[AnyJson]:
+        for segment in range(segments, -1, -1):
+            path = self._segment_file(key, segment)
+            self._read_bytes.inc(path.stat().st_size)
+            yield from self._serializer.iter(path)
+
+    @contextmanager
+    def iter_write(
+        self, key: str, append: bool = False, segment: int = 0
+    ) -> Iterator[Feed]:
+        path = self._writable(self._segment_file(key, segment))
+        size = path.stat().st_size if append and path.exists() else 0
+        try:
+            with self._serializer.iter_write(path, append=append) as feed:
+                yield feed
+        finally:
+            # interrupted streams count too, their items stay for a resume
+            if path.exists():
+                self._written_bytes.inc(path.stat().st_size - size)
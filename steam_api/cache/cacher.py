@@ -1,76 +1,241 @@
+from functools import wraps
+from inspect import isasyncgenfunction, iscoroutinefunction
 from inspect import isgeneratorfunction as is_generator
+from inspect import signature
 from pathlib import Path
-from typing import Callable, Iterator, Literal, ParamSpec, Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    Type,
+    TypeVar,
+    cast,
+)
 
 from pydantic import BaseModel
 
 from steam_api.cache.backends import CacheBackend, CacheFiles
+from steam_api.cache.entries import CachedError, EntryCodec, Value
+from steam_api.cache.memory import MISSING, MemoryCache, Missing
+from steam_api.cache.metrics import CacheMetrics
+from steam_api.cache.offload import offload
 from steam_api.cache.serializers import SerializerBase, SerializerYaml
-from steam_api.common import ROOT, AnyJson, identity
+from steam_api.cache.stream_cache import StreamCache
+from steam_api.cache.streams import AsyncGeneratorFunc, GeneratorFunc
+from steam_api.cache.value_cache import Expiry, Func, ValueCache
+from steam_api.common import ROOT, AnyDict
 
-T = TypeVar('T', bound=BaseModel)
-P = ParamSpec('P')
-F = Callable[P, T | None]
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def unwrap(result: Value | CachedError) -> Value:
+    if isinstance(result, CachedError):
+        result.raise_()
+    return result
 
 
 class CacheDecorator:
-    def __init__(
+    """Caches results of a function, coroutine or generator: values go to a
+    `ValueCache`, streams of items to a `StreamCache`"""
+
+    def __init__(  # pylint:disable=too-many-arguments
         self,
         cache_backend: CacheBackend,
-        model: BaseModel | None,
+        model: Type[BaseModel] | None,
         key_function: Callable[..., str] | None,
+        *,
+        memory: MemoryCache | None = None,
+        ttl: float | None = None,
+        stale_while_revalidate: bool = False,
+        negative: tuple[Type[Exception], ...] = (),
+        negative_ttl: float | None = None,
+        trusted: bool = False,
     ):
-        self.cache_backend = cache_backend
-        self.model = model
         self.key_function = key_function
+        self.stale_while_revalidate = stale_while_revalidate
+        self.codec = EntryCodec(model, negative, trusted)
+        metrics = CacheMetrics.of(cache_backend.prefix)
+        expiry = Expiry(ttl, negative_ttl)
+        self.values = ValueCache(cache_backend, self.codec, metrics, memory, expiry)
+        self.streams = StreamCache(cache_backend, self.codec, metrics)
+
+    @property
+    def cache_backend(self) -> CacheBackend:
+        return self.values.cache_backend
+
+    @cache_backend.setter
+    def cache_backend(self, cache_backend: CacheBackend) -> None:
+        # one backend for values and streams
+        self.values.cache_backend = self.streams.cache_backend = cache_backend
+
+    @property
+    def memory(self) -> MemoryCache | None:
+        return self.values.memory
 
-    @staticmethod
-    def _model_dump(data: BaseModel) -> AnyJson:
-        return data and data.model_dump(by_alias=True, exclude_unset=True)
+    @memory.setter
+    def memory(self, memory: MemoryCache | None) -> None:
+        self.values.memory = memory
 
-    def _model_load(self, data: AnyJson) -> BaseModel | None:
-        return data and self.model.model_validate(data)
+    def key(self, *args: Any) -> str:
+        # None without a key function: the backend holds a single entry
+        return cast(str, self.key_function and self.key_function(*args))
+
+    def cached(
+        self, *args: Any, fields: Iterable[str] | None = None
+    ) -> Value | CachedError | Missing:
+        """Fresh stored result of a call with `args`, `MISSING` if there is none"""
+        found = self.values.lookup(self.key(*args), fields)
+        if found is MISSING:
+            return MISSING
+        result, written_at = found
+        if not self.values.expiry.is_fresh(written_at, isinstance(result, CachedError)):
+            return MISSING
+        return result
+
+    def put(self, *args: Any, value: Value) -> None:
+        """Store `value` as the result of a call with `args`"""
+        self.values.store(self.key(*args), value)
+
+    def remember_error(self, key: str, error: Exception) -> None:
+        """Store `error` to be raised on hits, as if the function had raised it"""
+        self.values.store(key, CachedError(error))
+
+    def stream_meta(self, key: str) -> AnyDict | None:
+        return self.streams.meta(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.streams.is_complete(self.streams.meta(key))
 
     def __call__(self, func: F) -> F:
-        key_function = self.key_function
-        self.cache_backend.no_args_mode = key_function is None
-        if self.model:
-            # todo: move to external middleware;
-            #  both cache backend and serializers are middlewares too!
-            _dump = self._model_dump
-            _load = self._model_load
+        self.cache_backend.no_args_mode = self.key_function is None
+        self.values.conditional = 'validators' in signature(func).parameters
+        wrapper: Callable[..., Any]
+        if isasyncgenfunction(func):
+            wrapper = self._wrap_async_generator(func)
+        elif iscoroutinefunction(func):
+            wrapper = self._wrap_coroutine(func)
+        elif is_generator(func):
+            wrapper = self._wrap_generator(func)
         else:
-            _dump = identity
-            _load = identity
-        if not is_generator(func):
+            wrapper = self._wrap_function(func)
+        wrapper.cache = self  # type: ignore[union-attr]
+        return cast(F, wrapper)
 
-            def hit(key: str) -> T | None:
-                result = self.cache_backend[key]
-                return _load(result)
+    def _wrap_function(self, func: Func) -> Callable[..., Value]:
+        values = self.values
 
-            def miss(key: str, result: T | None) -> T | None:
-                self.cache_backend[key] = _dump(result)
-                return result
+        @wraps(func)
+        def wrapper(
+            *args: Any, refresh: bool = False, fields: Iterable[str] | None = None
+        ) -> Value:
+            key = self.key(*args)
+            if not refresh and (found := values.lookup(key, fields)) is not MISSING:
+                result, written_at = found
+                if values.expiry.is_fresh(written_at, isinstance(result, CachedError)):
+                    return unwrap(result)
+                if self.stale_while_revalidate:
+                    values.revalidate(key, func, args)
+                    return unwrap(result)
+            result = values.fetch(key, func, args)
+            return unwrap(self.codec.project(result, fields))
 
-        else:
+        return wrapper
+
+    def _wrap_coroutine(self, func: Func) -> Callable[..., Awaitable[Value]]:
+        values = self.values
+
+        @wraps(func)
+        async def wrapper(
+            *args: Any, refresh: bool = False, fields: Iterable[str] | None = None
+        ) -> Value:
+            key = self.key(*args)
+            if (
+                not refresh
+                and (found := await values.alookup(key, fields)) is not MISSING
+            ):
+                result, written_at = found
+                if values.expiry.is_fresh(written_at, isinstance(result, CachedError)):
+                    return unwrap(result)
+                if self.stale_while_revalidate:
+                    values.arevalidate(key, func, args)
+                    return unwrap(result)
+            result = await values.afetch(key, func, args)
+            return unwrap(self.codec.project(result, fields))
+
+        return wrapper
+
+    def _is_fresh_stream(self, key: str) -> bool:
+        return self.values.expiry.is_fresh(self.values.written_at(key))
+
+    def _new_validators(self) -> AnyDict | None:
+        # filled in by conditional generators for the stream they are about to store
+        return {} if self.values.conditional else None
+
+    def _wrap_generator(self, func: GeneratorFunc) -> Callable[..., Iterator[Value]]:
+        # generators accepting `since` can fetch only items newer than the stored ones
+        incremental = 'since' in signature(func).parameters
+        streams = self.streams
+
+        def stream(key: str, args: tuple[Any, ...], refresh: bool) -> Iterator[Value]:
+            meta = streams.meta(key)
+            if not streams.is_complete(meta):
+                return streams.iter_miss(key, func, args, meta, self._new_validators())
+            if not refresh and self._is_fresh_stream(key):
+                return streams.iter_hit(key, meta)
+            if incremental:
+                return streams.iter_refresh(key, func, args, meta)
+            if self.values.conditional:
+                return streams.iter_revalidate(key, func, args, meta)
+            return streams.iter_miss(key, func, args, None, self._new_validators())
+
+        @wraps(func)
+        def wrapper(*args: Any, refresh: bool = False) -> Iterator[Value]:
+            key = self.key(*args)
+            meta = streams.meta(key)
+            if not refresh and streams.is_complete(meta) and self._is_fresh_stream(key):
+                return streams.iter_hit(key, meta)
+            # writes of the stream are single-flight: a concurrent caller waits for
+            # the first one and replays what it stored instead of fetching again
+            return streams.flights.iter_exclusive(
+                key, lambda waited: stream(key, args, refresh and not waited)
+            )
+
+        return wrapper
 
-            def hit(key: str) -> Iterator[T]:
-                for item in self.cache_backend.iter(key):
-                    yield _load(item)
+    def _wrap_async_generator(
+        self, func: AsyncGeneratorFunc
+    ) -> Callable[..., AsyncIterator[Value]]:
+        incremental = 'since' in signature(func).parameters
+        streams = self.streams
 
-            def miss(key: str, result: Iterator[T]) -> Iterator[T]:
-                with self.cache_backend.iter_write(key) as feed:
-                    for item in result:
-                        feed(_dump(item))
-                        yield item
+        async def stream(
+            key: str, args: tuple[Any, ...], refresh: bool
+        ) -> AsyncIterator[Value]:
+            meta = await offload(streams.meta, key)
+            if not streams.is_complete(meta):
+                result = streams.aiter_miss(key, func, args, meta)
+            elif not refresh and await offload(self._is_fresh_stream, key):
+                result = streams.aiter_hit(key, meta)
+            elif incremental:
+                result = streams.aiter_refresh(key, func, args, meta)
+            else:
+                result = streams.aiter_miss(key, func, args, None)
+            async for item in result:
+                yield item
 
-        def wrapper(*args) -> T | None:
-            key = key_function and key_function(*args)
-            if key in self.cache_backend:
-                return hit(key)
-            return miss(key, func(*args))
+        @wraps(func)
+        async def wrapper(*args: Any, refresh: bool = False) -> AsyncIterator[Value]:
+            key = self.key(*args)
+            result = streams.flights.aiter_exclusive(
+                key, lambda waited: stream(key, args, refresh and not waited)
+            )
+            async for item in result:
+                yield item
 
-        wrapper.cache = self
         return wrapper
 
 
@@ -92,11 +257,31 @@ class Cache:
         key: Literal['all_str', 'no_self', 'self_id'] | None = 'no_self',
         serializer: SerializerBase = SerializerYaml(),
         cache_backend: Type[CacheBackend] = CacheFiles,
+        *,
+        memory: MemoryCache | None = None,
+        ttl: float | None = None,
+        stale_while_revalidate: bool = False,
+        negative: tuple[Type[Exception], ...] = (),
+        negative_ttl: float | None = None,
+        trusted: bool = False,
     ) -> CacheDecorator:
+        """`ttl` in seconds; generators past it are refreshed, incrementally
+        where they support `since`. With `stale_while_revalidate` expired
+        values are returned at once and refreshed in the background.
+        `negative` exceptions of functions are cached too and raised again
+        on hits, for `negative_ttl` seconds. `trusted` values written by the
+        same version of `model` are loaded without type checks. Functions
+        taking `validators` are refreshed conditionally, see `NotModified`."""
         return CacheDecorator(
             cache_backend(path=self.path / prefix, serializer=serializer),
             model,
             key_function=self.KEY_FUNCTIONS[key],
+            memory=memory,
+            ttl=ttl,
+            stale_while_revalidate=stale_while_revalidate,
+            negative=negative,
+            negative_ttl=negative_ttl,
+            trusted=trusted,
         )
 
 
@@ -0,0 +1,131 @@
+from typing import Any, Callable, Iterable, NamedTuple, NoReturn, Type
+
+from pydantic import BaseModel
+
+from steam_api.cache.memory import MISSING, Missing
+from steam_api.cache.projection import project, projection
+from steam_api.cache.trusted import schema_version, trusted_validator
+from steam_api.common import AnyDict, AnyJson, identity
+
+# results of cached functions: models, or json-like data without a model
+Value = BaseModel | AnyJson
+
+# stored in place of the value when the function raised a negative exception
+ERROR_KEY = '__error__'
+# schema version of the model that wrote a value, see `trusted`
+SCHEMA_KEY = '__schema__'
+# meta of conditional requests, e.g. the ETag of the stored value; see `NotModified`
+VALIDATORS_KEY = 'validators'
+
+
+class CachedError(NamedTuple):
+    """An exception remembered in place of a value, raised again on a hit"""
+
+    error: Exception
+
+    def dump(self) -> AnyDict:
+        return {
+            ERROR_KEY: {
+                'type': type(self.error).__name__,
+                'args': list(self.error.args),
+            }
+        }
+
+    def raise_(self) -> NoReturn:
+        # a fresh instance, so tracebacks do not pile up on a shared one
+        raise type(self.error)(*self.error.args)
+
+
+class NotModified(Exception):
+    """Raised by a cached function taking `validators` when the source reports
+    the stored value as current, e.g. on an HTTP 304. The stored value is
+    returned and counts as just written."""
+
+
+class EntryCodec:
+    """Values to stored entries and back: model dumps and loads, schema stamps
+    of trusted models, remembered errors"""
+
+    def __init__(
+        self,
+        model: Type[BaseModel] | None,
+        negative: tuple[Type[Exception], ...] = (),
+        trusted: bool = False,
+    ):
+        self.model = model
+        self.negative = negative
+        self._negative_types = {exc.__name__: exc for exc in negative}
+        self.schema: str | None = None
+        self.dump: Callable[[Any], AnyJson]
+        self.load: Callable[[AnyJson], Value]
+        if model:
+            # todo: move to external middleware;
+            #  both cache backend and serializers are middlewares too!
+            self.dump = self._model_dump
+            self.load = self._model_load
+            if trusted:
+                self.schema = schema_version(model)
+                self._trusted_load = trusted_validator(model).validate_python
+        else:
+            self.dump = identity
+            self.load = identity
+
+    @staticmethod
+    def _model_dump(data: BaseModel | None) -> AnyJson:
+        return (
+            None if data is None else data.model_dump(by_alias=True, exclude_unset=True)
+        )
+
+    def _model_load(self, data: AnyJson) -> Value:
+        assert self.model
+        return data and self.model.model_validate(data)
+
+    def is_trusted(self, stamped: AnyDict) -> bool:
+        """Whether data stamped so was written by the current model"""
+        return bool(self.schema) and stamped.get(SCHEMA_KEY) == self.schema
+
+    def stamp(self) -> AnyDict:
+        return {SCHEMA_KEY: self.schema} if self.schema else {}
+
+    def item_loader(self, meta: AnyDict | None) -> Callable[[AnyJson], Value]:
+        """Loads items of a stream with this meta"""
+        return self._trusted_load if meta and self.is_trusted(meta) else self.load
+
+    def load_entry(
+        self, raw: AnyJson, fields: Iterable[str] | None = None
+    ) -> Value | CachedError | Missing:
+        if isinstance(raw, dict) and ERROR_KEY in raw:
+            return self._load_error(raw[ERROR_KEY])
+        trusted = isinstance(raw, dict) and self.is_trusted(raw)
+        if fields:
+            assert self.model
+            # only the requested fields are materialized, the raw entry is dropped
+            slim = projection(self.model, fields)
+            if trusted:
+                return trusted_validator(slim).validate_python(raw)
+            return raw and slim.model_validate(raw)
+        if trusted:
+            return self._trusted_load(raw)
+        return self.load(raw)
+
+    def _load_error(self, error: AnyDict) -> CachedError | Missing:
+        if error['type'] not in self._negative_types:
+            # no longer cached negatively: fetch again
+            return MISSING
+        return CachedError(self._negative_types[error['type']](*error['args']))
+
+    def dump_entry(self, result: Value | CachedError) -> AnyJson:
+        if isinstance(result, CachedError):
+            return result.dump()
+        raw = self.dump(result)
+        if self.schema and isinstance(raw, dict):
+            raw[SCHEMA_KEY] = self.schema
+        return raw
+
+    @staticmethod
+    def project(
+        result: Value | CachedError, fields: Iterable[str] | None
+    ) -> Value | CachedError:
+        if fields and isinstance(result, BaseModel):
+            return project(result, fields)
+        return result
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from queue import SimpleQueue
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+REVALIDATE_WORKERS = 4
+
+
+class DaemonPool:
+    """Runs calls on daemon threads: refreshes still pending or running at
+    exit are dropped instead of holding the interpreter up. An interrupted
+    refresh leaves the stale entry in place: files are replaced atomically,
+    sqlite writes are transactions and the log drops a torn last record."""
+
+    def __init__(self, workers: int, name: str):
+        self.workers = workers
+        self.name = name
+        self._queue: SimpleQueue[
+            tuple[Callable[..., object], tuple[Any, ...]]
+        ] = SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., object], *args: Any) -> None:
+        self._queue.put((func, args))
+        with self._lock:
+            # threads are only started once there is work for them
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f'{self.name}_{len(self._threads)}',
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            func, args = self._queue.get()
+            func(*args)
+
+
+revalidation_pool = DaemonPool(REVALIDATE_WORKERS, 'revalidate')
+
+
+class Flights:
+    """Calls in flight by key: concurrent misses of a key share the first call,
+    a key is refreshed in the background by one call at a time"""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, Future[Any]] = {}
+        self._inflight_lock = threading.Lock()
+        self._ainflight: dict[str, asyncio.Future[Any]] = {}
+        self._revalidating: set[str] = set()
+        self._revalidating_lock = threading.Lock()
+        self._tasks: set[asyncio.Task[None]] = set()
+        # key: [lock, holders and waiters]; dropped once nobody needs the lock
+        self._held: dict[str, list[Any]] = {}
+
+    def share(self, key: str, call: Callable[[], T]) -> T:
+        """Result of `call`; concurrent calls for the same key share a single one"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        return result
+
+    async def ashare(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        if (future := self._ainflight.get(key)) is not None:
+            # shielded: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+        future = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # marks it retrieved: without waiters nobody else looks at it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._ainflight[key]
+        return result
+
+    def _lock(self, key: str, new: Callable[[], object]) -> list[Any]:
+        with self._inflight_lock:
+            entry = self._held.setdefault(key, [new(), 0])
+            entry[1] += 1
+        return entry
+
+    def _unlock(self, key: str, entry: list[Any]) -> None:
+        with self._inflight_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._held[key]
+
+    def iter_exclusive(
+        self, key: str, stream: Callable[[bool], Iterator[T]]
+    ) -> Iterator[T]:
+        """Items of `stream`, run for one caller of `key` at a time. It is told
+        whether it waited: the caller before has just stored the stream."""
+        entry = self._lock(key, threading.Lock)
+        lock = entry[0]
+        waited = not lock.acquire(blocking=False)
+        if waited:
+            lock.acquire()
+        try:
+            yield from stream(waited)
+        finally:
+            lock.release()
+            self._unlock(key, entry)
+
+    async def aiter_exclusive(
+        self, key: str, stream: Callable[[bool], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        entry = self._lock(key, asyncio.Lock)
+        lock = entry[0]
+        waited = lock.locked()
+        try:
+            async with lock:
+                async for item in stream(waited):
+                    yield item
+        finally:
+            self._unlock(key, entry)
+
+    def _start_revalidation(self, key: str) -> bool:
+        """Claim the key; False if its refresh is already running"""
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _end_revalidation(self, key: str, error: Exception | None) -> None:
+        if error is not None:
+            # the stale entry stays; the next lookup tries again
+            print(f'revalidate {key} failed: {type(error).__name__}: {error}')
+        with self._revalidating_lock:
+            self._revalidating.discard(key)
+
+    def revalidate(self, key: str, call: Callable[[], object]) -> None:
+        """Run `call` on a background thread"""
+        if self._start_revalidation(key):
+            revalidation_pool.submit(self._revalidate, key, call)
+
+    def _revalidate(self, key: str, call: Callable[[], object]) -> None:
+        error = None
+        try:
+            self.share(key, call)
+        except Exception as e:  # pylint:disable=broad-except
+            error = e
+        self._end_revalidation(key, error)
+
+    def arevalidate(self, key: str, call: Callable[[], Awaitable[object]]) -> None:
+        """Run `call` in a background task of the running loop"""
+        if self._start_revalidation(key):
+            task = asyncio.create_task(self._arevalidate(key, call))
+            # the loop keeps only weak references to tasks
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _arevalidate(
+        self, key: str, call: Callable[[], Awaitable[object]]
+    ) -> None:
+        error = None
+        try:
+            await self.ashare(key, call)
+        except Exception as e:  # pylint:disable=broad-except
+            error = e
+        self._end_revalidation(key, error)
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import IO
+
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.serializers import SerializerBase
+from steam_api.common import AnyDict, AnyJson
+
+
+class CacheLog(CacheBackend):
+    """Single-file cache that appends a record per write.
+
+    A record is a `<kind>\t<key>\t<length>\n` header followed by the serialized
+    value and a newline; the key is a JSON string, so tabs and newlines in keys
+    are escaped. The key -> offset index is rebuilt by skipping through the
+    headers on open; superseded records are dropped by `compact`, which runs by
+    itself once they outweigh live ones.
+    """
+
+    VALUE = b'v'
+    META = b'm'
+    COMPACT_MIN_BYTES = 1 << 20
+    COMPACT_RATIO = 1.0
+
+    def __init__(self, path: Path, serializer: SerializerBase):
+        super().__init__(path, serializer)
+        self._file = path.with_name(f'{path.name}.{self.ext}.log')
+        self._f: IO[bytes] | None = None
+        # (kind, key) -> (offset of the value, its length, size of the record)
+        self._index: dict[tuple[bytes, str], tuple[int, int, int]] = {}
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._lock = threading.RLock()
+
+    def _open(self) -> IO[bytes]:
+        if self._f is None:
+            self._file.parent.mkdir(exist_ok=True, parents=True)
+            self._f = open(self._file, 'a+b')  # pylint:disable=consider-using-with
+            self._load_index(self._f)
+        return self._f
+
+    def _load_index(self, f: IO[bytes]) -> None:
+        file_size = os.fstat(f.fileno()).st_size
+        f.seek(0)
+        offset = 0
+        while header := f.readline():
+            if not header.endswith(b'\n'):
+                break
+            kind, key, length = self._parse_header(header, offset)
+            start = offset + len(header)
+            end = start + length + 1
+            if end > file_size:
+                break
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                raise ValueError(f'{self._file}: corrupt record at {offset}')
+            self._add(kind, key, start, length, end - offset)
+            offset = end
+        if offset < file_size:
+            # a record torn by a crash, it can only be the last one
+            f.truncate(offset)
+
+    def _parse_header(self, header: bytes, offset: int) -> tuple[bytes, str, int]:
+        try:
+            kind, key, length = header.rstrip(b'\n').split(b'\t')
+            return kind, json.loads(key), int(length)
+        except ValueError as e:
+            raise ValueError(f'{self._file}: corrupt record at {offset}') from e
+
+    @staticmethod
+    def _header(kind: bytes, key: str, length: int) -> bytes:
+        return b'%s\t%s\t%d\n' % (kind, json.dumps(key).encode(), length)
+
+    def _add(self, kind: bytes, key: str, start: int, length: int, size: int) -> None:
+        if old := self._index.get((kind, key)):
+            self._live_bytes -= old[2]
+            self._dead_bytes += old[2]
+        self._index[kind, key] = (start, length, size)
+        self._live_bytes += size
+
+    def _read(self, kind: bytes, key: str) -> bytes | None:
+        with self._lock:
+            log = self._open()
+            if (kind, key) not in self._index:
+                return None
+            start, length, _ = self._index[kind, key]
+            log.seek(start)
+            return log.read(length)
+
+    def _append(self, kind: bytes, key: str, payload: bytes) -> None:
+        header = self._header(kind, key, len(payload))
+        with self._lock:
+            log = self._open()
+            offset = log.seek(0, os.SEEK_END)
+            log.write(header + payload + b'\n')
+            log.flush()
+            size = len(header) + len(payload) + 1
+            self._add(kind, key, offset + len(header), len(payload), size)
+            if self._dead_bytes > max(
+                self.COMPACT_MIN_BYTES, self._live_bytes * self.COMPACT_RATIO
+            ):
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log keeping only the latest record of every key"""
+        with self._lock:
+            log = self._open()
+            tmp = self._file.with_name(self._file.name + '.tmp')
+            index = {}
+            with open(tmp, 'wb') as out:
+                for (kind, key), (start, length, _) in self._index.items():
+                    log.seek(start)
+                    payload = log.read(length)
+                    header = self._header(kind, key, length)
+                    offset = out.tell()
+                    out.write(header + payload + b'\n')
+                    index[kind, key] = (
+                        offset + len(header),
+                        length,
+                        out.tell() - offset,
+                    )
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self._file)
+            log.close()
+            self._f = open(self._file, 'a+b')  # pylint:disable=consider-using-with
+            self._index = index
+            self._live_bytes = sum(size for _, _, size in index.values())
+            self._dead_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._open()
+            return (self.VALUE, str(key)) in self._index
+
+    def __getitem__(self, key: str) -> AnyJson:
+        raw = self._read(self.VALUE, str(key))
+        if raw is None:
+            raise KeyError(key)
+        self._read_bytes.inc(len(raw))
+        return self._serializer.loads(raw)
+
+    def __setitem__(self, key: str, value: AnyJson) -> None:
+        raw = self._serializer.dumps(value)
+        self._written_bytes.inc(len(raw))
+        self._append(self.VALUE, str(key), raw)
+
+    def get_meta(self, key: str) -> AnyDict:
+        raw = self._read(self.META, str(key))
+        return json.loads(raw) if raw else {}
+
+    def set_meta(self, key: str, meta: AnyDict) -> None:
+        self._append(self.META, str(key), json.dumps(meta).encode())
@@ -0,0 +1,82 @@
+import sys
+import threading
+from collections import OrderedDict
+from enum import Enum, auto
+from typing import Any, Final
+
+
+class Missing(Enum):
+    """No value, unlike None which may be a stored one"""
+
+    MISSING = auto()
+
+
+MISSING: Final = Missing.MISSING
+
+
+def approx_size(data: Any) -> int:
+    """Rough in-memory footprint of json-like data, in bytes"""
+    if isinstance(data, dict):
+        return sys.getsizeof(data) + sum(
+            approx_size(key) + approx_size(value) for key, value in data.items()
+        )
+    if isinstance(data, list):
+        return sys.getsizeof(data) + sum(approx_size(item) for item in data)
+    return sys.getsizeof(data)
+
+
+class MemoryCache:
+    """In-process LRU of loaded values, bounded by entry count and/or bytes"""
+
+    def __init__(self, max_entries: int | None = 1024, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Any, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Any) -> Any:
+        """The value, or `MISSING`"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key][0]
+
+    def put(self, key: Any, value: Any, size: int) -> None:
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self._data and self._over_limit():
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key: Any) -> None:
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and len(self._data) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.bytes > self.max_bytes
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'entries': len(self._data),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
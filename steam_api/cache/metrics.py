@@ -0,0 +1,46 @@
+from typing import NamedTuple
+
+from steam_api.metrics import CounterValue, HistogramValue, counter, histogram
+
+CACHE_HITS = counter(
+    'steam_api_cache_hits_total',
+    'Lookups answered by the cache; tier: memory, backend or revalidated',
+    ('prefix', 'tier'),
+)
+CACHE_MISSES = counter(
+    'steam_api_cache_misses_total',
+    'Calls of the cached function whose result was stored',
+    ('prefix',),
+)
+CACHE_LOAD_SECONDS = histogram(
+    'steam_api_cache_load_seconds',
+    'Reading and loading a value or a stream item',
+    ('prefix',),
+)
+CACHE_DUMP_SECONDS = histogram(
+    'steam_api_cache_dump_seconds',
+    'Dumping and writing a value or a stream item',
+    ('prefix',),
+)
+
+
+class CacheMetrics(NamedTuple):
+    """Metrics of one decorator, bound to its prefix"""
+
+    memory_hits: CounterValue
+    backend_hits: CounterValue
+    revalidated: CounterValue
+    misses: CounterValue
+    load_seconds: HistogramValue
+    dump_seconds: HistogramValue
+
+    @classmethod
+    def of(cls, prefix: str) -> 'CacheMetrics':
+        return cls(
+            CACHE_HITS.labels(prefix, 'memory'),
+            CACHE_HITS.labels(prefix, 'backend'),
+            CACHE_HITS.labels(prefix, 'revalidated'),
+            CACHE_MISSES.labels(prefix),
+            CACHE_LOAD_SECONDS.labels(prefix),
+            CACHE_DUMP_SECONDS.labels(prefix),
+        )
@@ -0,0 +1,26 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar('T')
+
+# streams in flight at once without waiting on each other's I/O, see `offload_pinned`
+IO_LANES = 16
+# one thread each: sqlite connections and cursors of open streams are bound to
+# the thread that made them, the reads and writes of a stream stay on its lane
+_lanes = [
+    ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'cache_io_{i}')
+    for i in range(IO_LANES)
+]
+
+
+async def offload(func: Callable[..., T], *args: Any) -> T:
+    """Backend I/O, parsing and model loads of async cache paths, run off the
+    event loop on its default executor"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def offload_pinned(key: str | None, func: Callable[..., T], *args: Any) -> T:
+    """As `offload`, on the thread every call for `key` runs on"""
+    lane = _lanes[hash(key) % IO_LANES]
+    return await asyncio.get_running_loop().run_in_executor(lane, func, *args)
@@ -0,0 +1,40 @@
+from functools import cache
+from typing import Any, Iterable, Type
+
+from pydantic import BaseModel, create_model
+
+
+@cache
+def _projection(model: Type[BaseModel], fields: frozenset[str]) -> Type[BaseModel]:
+    if unknown := fields - model.model_fields.keys():
+        raise ValueError(f'{model.__name__} has no fields {sorted(unknown)}')
+    definitions: dict[str, Any] = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    return create_model(
+        f'{model.__name__}[{", ".join(sorted(fields))}]',
+        __config__=model.model_config,
+        **definitions,
+    )
+
+
+def projection(model: Type[BaseModel], fields: Iterable[str]) -> Type[BaseModel]:
+    """Slim variant of `model` with only `fields`, aliases and defaults kept.
+
+    It validates the data of `model` as is, other keys are ignored.
+    """
+    return _projection(model, frozenset(fields))
+
+
+def project(model: BaseModel, fields: Iterable[str]) -> BaseModel:
+    """The projection of an already loaded instance"""
+    slim = projection(type(model), fields)
+    return slim.model_validate(
+        {
+            info.alias or name: getattr(model, name)
+            for name, info in slim.model_fields.items()
+            if name in model.model_fields_set
+        }
+    )
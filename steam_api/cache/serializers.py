@@ -1,15 +1,51 @@
 import abc
+import bz2
+import gzip
 import json
+import lzma
 from contextlib import contextmanager
+from copy import copy
+from functools import partial
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Callable, Iterator
+from typing import IO, Any, Callable, ContextManager, Iterator
 
 import yaml
 
-from steam_api.common import AnyDict, AnyJson
+from steam_api.common import AnyJson
+from steam_api.utils import JSON_CHUNK, iter_json_array
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    from yaml import CSafeDumper as YamlDumper
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as YamlDumper
+    from yaml import SafeLoader as YamlLoader
+
+
+class Feed:
+    """Item writer handed out by `iter_write`"""
+
+    def __init__(self, f: IO[Any], encode: Callable[[AnyJson], str | bytes]):
+        self._f = f
+        self._encode = encode
+
+    def __call__(self, item: AnyJson) -> None:
+        self._f.write(self._encode(item))
+
+    def flush(self) -> None:
+        self._f.flush()
 
 
 class SerializerBase:
+    # swapped for a codec's `open` by `Compressed`
+    _open: Callable[..., IO[Any]] = staticmethod(open)
+
     @property
     @abc.abstractmethod
     def EXT(self) -> str:  # pylint:disable=invalid-name
@@ -23,10 +59,18 @@ class SerializerBase:
     def load(self, path: Path) -> AnyJson:
         ...
 
-    def iter(self, path) -> Iterator[AnyJson]:
+    @abc.abstractmethod
+    def dumps(self, data: AnyJson) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def loads(self, raw: bytes) -> AnyJson:
+        ...
+
+    def iter(self, path: Path) -> Iterator[AnyJson]:
         raise NotImplementedError
 
-    def iter_write(self, path) -> Iterator[Callable[[AnyDict], None]]:
+    def iter_write(self, path: Path, append: bool = False) -> ContextManager[Feed]:
         raise NotImplementedError
 
 
@@ -34,52 +78,163 @@ class SerializerJson(SerializerBase):
     EXT = 'json'
 
     def dump(self, path: Path, data: AnyJson) -> None:
-        with open(path, 'wt') as f:
+        with self._open(path, 'wt') as f:
             json.dump(data, f, ensure_ascii=False)
 
     def load(self, path: Path) -> AnyJson:
-        with open(path, 'rt') as f:
+        with self._open(path, 'rt') as f:
             return json.load(f)
 
+    def dumps(self, data: AnyJson) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode()
 
-class SerializerYaml(SerializerBase):
-    EXT = 'yml'
+    def loads(self, raw: bytes) -> AnyJson:
+        return json.loads(raw)
+
+    def iter(self, path: Path) -> Iterator[AnyJson]:
+        with self._open(path, 'rb') as f:
+            yield from iter_json_array(iter(partial(f.read, JSON_CHUNK), b''))
+
+    @contextmanager
+    def iter_write(self, path: Path, append: bool = False) -> Iterator[Feed]:
+        """Items go into a JSON list; an appended write adds another list"""
+        separators = chain([b'\n'], repeat(b',\n'))
+        with self._open(path, 'ab' if append else 'wb') as f:
+            f.write(b'[')
+            try:
+                yield Feed(f, lambda item: next(separators) + self.dumps(item))
+            finally:
+                f.write(b'\n]\n')
+
+
+class SerializerJsonl(SerializerBase):
+    """One JSON document per line; uses `orjson` when installed and `fast` is on"""
+
+    EXT = 'jsonl'
+
+    def __init__(self, fast: bool = True):
+        if fast and orjson:
+            self.dumps = orjson.dumps  # type: ignore[method-assign,assignment]
+            self.loads = orjson.loads  # type: ignore[method-assign,assignment]
+
+    def dumps(self, data: AnyJson) -> bytes:  # pylint:disable=method-hidden
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+
+    def loads(self, raw: bytes) -> AnyJson:  # pylint:disable=method-hidden
+        return json.loads(raw)
 
     def dump(self, path: Path, data: AnyJson) -> None:
-        with open(path, 'wt') as f:
-            yaml.dump(data, stream=f, allow_unicode=True)
+        with self._open(path, 'wb') as f:
+            f.write(self.dumps(data) + b'\n')
 
     def load(self, path: Path) -> AnyJson:
-        with open(path, 'rt') as f:
-            return yaml.load(f, yaml.SafeLoader)
+        with self._open(path, 'rb') as f:
+            return self.loads(f.read())
 
-    def iter(self, path) -> Iterator[AnyJson]:
-        for chunk in self._yaml_chunks(path):
-            yield yaml.load(chunk, yaml.SafeLoader)[0]
+    def iter(self, path: Path) -> Iterator[AnyJson]:
+        loads = self.loads
+        with self._open(path, 'rb') as f:
+            for line in f:
+                yield loads(line)
 
     @contextmanager
-    def iter_write(self, path: Path) -> Iterator[Callable[[AnyDict], None]]:
-        with open(path, 'wt') as f:
+    def iter_write(self, path: Path, append: bool = False) -> Iterator[Feed]:
+        dumps = self.dumps
+        with self._open(path, 'ab' if append else 'wb') as f:
+            yield Feed(f, lambda item: dumps(item) + b'\n')
 
-            def feed(item: AnyDict):
-                f.write(yaml.dump([item], allow_unicode=True))
 
-            yield feed
+class SerializerYaml(SerializerBase):
+    EXT = 'yml'
+    # stream items parsed by a single `yaml.load`
+    BATCH_SIZE = 100
 
-    @staticmethod
-    def _yaml_chunks(path: Path) -> Iterator[str]:
-        with open(path, 'rt') as f:
-            lines = iter(f)
-            try:
-                chunk = next(lines)
-                assert chunk.startswith('- ')
-            except StopIteration:
-                return
+    def dump(self, path: Path, data: AnyJson) -> None:
+        with self._open(path, 'wt') as f:
+            yaml.dump(data, stream=f, Dumper=YamlDumper, allow_unicode=True)
 
-            for line in lines:
+    def load(self, path: Path) -> AnyJson:
+        with self._open(path, 'rt') as f:
+            return yaml.load(f, YamlLoader)
+
+    def dumps(self, data: AnyJson) -> bytes:
+        return yaml.dump(data, Dumper=YamlDumper, allow_unicode=True).encode()
+
+    def loads(self, raw: bytes) -> AnyJson:
+        return yaml.load(raw, YamlLoader)
+
+    def iter(self, path: Path) -> Iterator[AnyJson]:
+        for chunk in self._yaml_chunks(path, self.BATCH_SIZE):
+            yield from yaml.load(chunk, YamlLoader)
+
+    @contextmanager
+    def iter_write(self, path: Path, append: bool = False) -> Iterator[Feed]:
+        with self._open(path, 'at' if append else 'wt') as f:
+            yield Feed(
+                f, lambda item: yaml.dump([item], Dumper=YamlDumper, allow_unicode=True)
+            )
+
+    def _yaml_chunks(self, path: Path, items: int = 1) -> Iterator[str]:
+        """Split a top-level list into documents of `items` list items each"""
+        with self._open(path, 'rt') as f:
+            lines: list[str] = []
+            count = 0
+            for line in f:
                 if line.startswith('- '):
-                    yield chunk
-                    chunk = line
+                    if count == items:
+                        yield ''.join(lines)
+                        lines = []
+                        count = 0
+                    count += 1
                 else:
-                    chunk += line
-            yield chunk
+                    assert lines, 'a list item is expected first'
+                lines.append(line)
+            if lines:
+                yield ''.join(lines)
+
+
+CODECS: dict[
+    str,
+    tuple[str, Callable[..., Any], Callable[[bytes], bytes], Callable[[bytes], bytes]],
+] = {
+    # name: (extension, open, compress, decompress)
+    'gzip': (
+        'gz',
+        partial(gzip.open, compresslevel=6),
+        partial(gzip.compress, compresslevel=6),
+        gzip.decompress,
+    ),
+    'bz2': ('bz2', bz2.open, bz2.compress, bz2.decompress),
+    'lzma': ('xz', lzma.open, lzma.compress, lzma.decompress),
+}
+
+
+class Compressed(SerializerBase):
+    """Any serializer with its files (or blobs) compressed by `codec`"""
+
+    def __init__(self, serializer: SerializerBase, codec: str = 'gzip'):
+        self._ext, opener, self._compress, self._decompress = CODECS[codec]
+        self._serializer = copy(serializer)
+        self._serializer._open = opener
+
+    @property
+    def EXT(self) -> str:  # pylint:disable=invalid-name
+        return f'{self._serializer.EXT}.{self._ext}'
+
+    def dump(self, path: Path, data: AnyJson) -> None:
+        self._serializer.dump(path, data)
+
+    def load(self, path: Path) -> AnyJson:
+        return self._serializer.load(path)
+
+    def dumps(self, data: AnyJson) -> bytes:
+        return self._compress(self._serializer.dumps(data))
+
+    def loads(self, raw: bytes) -> AnyJson:
+        return self._serializer.loads(self._decompress(raw))
+
+    def iter(self, path: Path) -> Iterator[AnyJson]:
+        return self._serializer.iter(path)
+
+    def iter_write(self, path: Path, append: bool = False) -> ContextManager[Feed]:
+        return self._serializer.iter_write(path, append=append)
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.serializers import Feed, SerializerBase
+from steam_api.common import AnyDict, AnyJson
+
+
+class BatchFeed(Feed):
+    def __init__(
+        self,
+        write: Callable[[list[bytes]], None],
+        encode: Callable[[AnyJson], bytes],
+        size: int,
+    ):
+        # pylint:disable=super-init-not-called
+        self._write = write
+        self._encode: Callable[[AnyJson], bytes] = encode
+        self._size = size
+        self._batch: list[bytes] = []
+
+    def __call__(self, item: AnyJson) -> None:
+        self._batch.append(self._encode(item))
+        if len(self._batch) >= self._size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._batch:
+            self._write(self._batch)
+            self._batch = []
+
+
+class CacheSqlite(CacheBackend):
+    """One table per prefix in a database shared by all prefixes of a cache dir.
+
+    Plain values and meta live in `<prefix>`, stream items in `<prefix>__items`.
+    Streams are written in batched transactions; WAL lets readers run alongside.
+    """
+
+    DB_NAME = 'cache.sqlite3'
+    BATCH_SIZE = 500
+
+    def __init__(self, path: Path, serializer: SerializerBase):
+        super().__init__(path, serializer)
+        self._db = path.parent / self.DB_NAME
+        self._table = path.name
+        self._items = f'{path.name}__items'
+        # sqlite connections can't be shared between threads
+        self._local = threading.local()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self._db.parent.mkdir(exist_ok=True, parents=True)
+            conn = sqlite3.connect(self._db, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{self._table}"'
+                    ' (key TEXT PRIMARY KEY, value BLOB, meta TEXT)'
+                )
+                conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{self._items}"'
+                    ' (key TEXT, segment INTEGER, seq INTEGER, value BLOB,'
+                    ' PRIMARY KEY (key, segment, seq))'
+                )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(key: str | None) -> str:
+        return '' if key is None else str(key)
+
+    def _row(self, key: str, column: str) -> tuple[Any, ...] | None:
+        return self._conn.execute(
+            f'SELECT {column} FROM "{self._table}" WHERE key = ?', (self._key(key),)
+        ).fetchone()
+
+    def __contains__(self, key: str) -> bool:
+        return self._row(key, '1') is not None
+
+    def __getitem__(self, key: str) -> AnyJson:
+        row = self._row(key, 'value')
+        if row is None:
+            raise KeyError(key)
+        self._read_bytes.inc(len(row[0]))
+        return self._serializer.loads(row[0])
+
+    def __setitem__(self, key: str, value: AnyJson) -> None:
+        raw = self._serializer.dumps(value)
+        self._written_bytes.inc(len(raw))
+        with self._conn as conn:
+            conn.execute(
+                (
+                    f'INSERT INTO "{self._table}" (key, value) VALUES (?, ?)'
+                    ' ON CONFLICT (key) DO UPDATE SET value = excluded.value'
+                ),
+                (self._key(key), raw),
+            )
+
+    def get_meta(self, key: str) -> AnyDict:
+        row = self._row(key, 'meta')
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def set_meta(self, key: str, meta: AnyDict) -> None:
+        with self._conn as conn:
+            conn.execute(
+                (
+                    f'INSERT INTO "{self._table}" (key, meta) VALUES (?, ?)'
+                    ' ON CONFLICT (key) DO UPDATE SET meta = excluded.meta'
+                ),
+                (self._key(key), json.dumps(meta)),
+            )
+
+    def iter(self, key: str, segments: int = 0) -> Iterator[AnyJson]:
+        cursor = self._conn.execute(
+            (
+                f'SELECT value FROM "{self._items}" WHERE key = ? AND segment <= ?'
+                ' ORDER BY segment DESC, seq'
+            ),
+            (self._key(key), segments),
+        )
+        while rows := cursor.fetchmany(self.BATCH_SIZE):
+            self._read_bytes.inc(sum(len(value) for (value,) in rows))
+            for (value,) in rows:
+                yield self._serializer.loads(value)
+
+    @contextmanager
+    def iter_write(
+        self, key: str, append: bool = False, segment: int = 0
+    ) -> Iterator[Feed]:
+        key = self._key(key)
+        conn = self._conn
+        with conn:
+            conn.execute(
+                f'INSERT OR IGNORE INTO "{self._table}" (key) VALUES (?)', (key,)
+            )
+            if not append:
+                conn.execute(
+                    f'DELETE FROM "{self._items}" WHERE key = ? AND segment = ?',
+                    (key, segment),
+                )
+        (seq,) = conn.execute(
+            (
+                f'SELECT COALESCE(MAX(seq) + 1, 0) FROM "{self._items}"'
+                ' WHERE key = ? AND segment = ?'
+            ),
+            (key, segment),
+        ).fetchone()
+        sequence = count(seq)
+
+        def write(batch: list[bytes]) -> None:
+            self._written_bytes.inc(sum(map(len, batch)))
+            with conn:
+                conn.executemany(
+                    f'INSERT INTO "{self._items}" VALUES (?, ?, ?, ?)',
+                    [(key, segment, next(sequence), value) for value in batch],
+                )
+
+        feed = BatchFeed(write, self._serializer.dumps, self.BATCH_SIZE)
+        yield feed
+        feed.flush()
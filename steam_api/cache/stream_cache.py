@@ -0,0 +1,299 @@
+from contextlib import asynccontextmanager
+from itertools import chain, islice
+from time import perf_counter, time
+from typing import Any, AsyncIterator, Generator, Iterator, TypeGuard
+
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.entries import VALIDATORS_KEY, EntryCodec, NotModified, Value
+from steam_api.cache.flight import Flights
+from steam_api.cache.memory import MISSING
+from steam_api.cache.metrics import CacheMetrics
+from steam_api.cache.offload import offload_pinned
+from steam_api.cache.serializers import Feed
+from steam_api.cache.streams import (
+    AsyncGeneratorFunc,
+    Checkpoint,
+    GeneratorFunc,
+    IncompleteStream,
+    StreamRecorder,
+    Yielded,
+    abatches,
+)
+from steam_api.common import AnyDict
+
+# items of an async stream read, loaded or recorded per hop to the I/O thread
+ITEM_BATCH = 100
+
+
+class StreamCache:
+    """Stored streams of a cached generator: replayed on hits, recorded while
+    the generator runs, refreshed incrementally or conditionally"""
+
+    def __init__(
+        self, cache_backend: CacheBackend, codec: EntryCodec, metrics: CacheMetrics
+    ):
+        self.cache_backend = cache_backend
+        self.codec = codec
+        self.metrics = metrics
+        self.flights = Flights()
+
+    def meta(self, key: str) -> AnyDict | None:
+        """Bookkeeping of a stored stream, None if there is no entry"""
+        if key not in self.cache_backend:
+            return None
+        return self.cache_backend.get_meta(key)
+
+    @staticmethod
+    def is_complete(meta: AnyDict | None) -> TypeGuard[AnyDict]:
+        # entries written before bookkeeping existed have no meta and are complete
+        return meta is not None and meta.get('complete', True)
+
+    def _recorder(  # pylint:disable=too-many-arguments
+        self,
+        key: str,
+        feed: Feed,
+        stored: int,
+        resume: AnyDict | None,
+        validators: AnyDict | None = None,
+    ) -> StreamRecorder:
+        # a stream resumed by another model version stays unstamped, mixed
+        stamp: AnyDict = {}
+        if resume is None or self.codec.is_trusted(resume):
+            stamp = self.codec.stamp()
+        if validators is not None:
+            # filled in by the generator once its response has arrived
+            stamp[VALIDATORS_KEY] = validators
+        observe = self.metrics.dump_seconds.observe
+        if resume is None:
+            return StreamRecorder(
+                self.cache_backend,
+                key,
+                feed,
+                self.codec.dump,
+                stamp=stamp,
+                observe=observe,
+            )
+        if stored < resume['count']:
+            # items were lost after the checkpoint was written, start over next time
+            self.cache_backend.set_meta(key, {'complete': False})
+            raise IncompleteStream(
+                f'{key}: {stored} items stored, {resume["count"]} expected'
+            )
+        skip = stored - resume['count']
+        return StreamRecorder(
+            self.cache_backend,
+            key,
+            feed,
+            self.codec.dump,
+            count=stored,
+            skip=skip,
+            stamp=stamp,
+            observe=observe,
+        )
+
+    @staticmethod
+    def _resume_point(meta: AnyDict | None) -> AnyDict | None:
+        return meta if meta and 'checkpoint' in meta else None
+
+    @staticmethod
+    def _refreshed(meta: AnyDict, segment: int, new_items: int) -> AnyDict:
+        meta = {**meta, 'complete': True, 'written_at': time()}
+        if new_items:
+            meta['segments'] = segment
+            if 'count' in meta:
+                meta['count'] += new_items
+        return meta
+
+    def iter_hit(self, key: str, meta: AnyDict | None = None) -> Iterator[Value]:
+        """Items of the stored stream"""
+        self.metrics.backend_hits.inc()
+        return self._items(key, meta)
+
+    def _items(
+        self, key: str, meta: AnyDict | None = None
+    ) -> Generator[Value, None, None]:
+        segments = meta.get('segments', 0) if meta else 0
+        load = self.codec.item_loader(meta)
+        observe = self.metrics.load_seconds.observe
+        items = self.cache_backend.iter(key, segments=segments)
+        while True:
+            # per item: reading and parsing happen as the backend iterator advances
+            start = perf_counter()
+            if (raw := next(items, MISSING)) is MISSING:
+                return
+            item = load(raw)
+            observe(perf_counter() - start)
+            yield item
+
+    def _feed_item(self, feed: Feed, item: Value) -> None:
+        start = perf_counter()
+        feed(self.codec.dump(item))
+        self.metrics.dump_seconds.observe(perf_counter() - start)
+
+    def _feed_items(self, feed: Feed, items: list[Value]) -> None:
+        for item in items:
+            self._feed_item(feed, item)
+
+    def iter_miss(  # pylint:disable=too-many-arguments
+        self,
+        key: str,
+        func: GeneratorFunc,
+        args: tuple[Any, ...],
+        meta: AnyDict | None,
+        validators: AnyDict | None = None,
+    ) -> Iterator[Value]:
+        """Run the generator and record its items; `validators` are passed to
+        generators taking them"""
+        stored = 0
+        kwargs = {} if validators is None else {'validators': validators}
+        self.metrics.misses.inc()
+        if resume := self._resume_point(meta):
+            for stored, item in enumerate(self._items(key, resume), start=1):
+                yield item
+            result = func(*args, resume_from=resume['checkpoint'], **kwargs)
+        else:
+            self.cache_backend.set_meta(key, {'complete': False})
+            result = func(*args, **kwargs)
+        yield from self._iter_store(key, result, stored, resume, validators)
+
+    def _iter_store(  # pylint:disable=too-many-arguments
+        self,
+        key: str,
+        result: Iterator[Yielded],
+        stored: int,
+        resume: AnyDict | None,
+        validators: AnyDict | None,
+    ) -> Iterator[Value]:
+        with self.cache_backend.iter_write(key, append=resume is not None) as feed:
+            record = self._recorder(key, feed, stored, resume, validators)
+            for item in result:
+                if record(item):
+                    yield item
+            record.complete()
+
+    def iter_revalidate(
+        self, key: str, func: GeneratorFunc, args: tuple[Any, ...], meta: AnyDict
+    ) -> Iterator[Value]:
+        """Fetch the stream again, unless the source reports the stored one current"""
+        validators = dict(meta.get(VALIDATORS_KEY, {}))
+        result = func(*args, validators=validators)
+        try:
+            # the stored stream is only replaced once the source answers with items
+            head = list(islice(result, 1))
+        except NotModified:
+            self.cache_backend.touch(key, time())
+            self.metrics.revalidated.inc()
+            yield from self._items(key, meta)
+            return
+        self.metrics.misses.inc()
+        self.cache_backend.set_meta(key, {'complete': False})
+        yield from self._iter_store(key, chain(head, result), 0, None, validators)
+
+    def iter_refresh(
+        self, key: str, func: GeneratorFunc, args: tuple[Any, ...], meta: AnyDict
+    ) -> Iterator[Value]:
+        """Fetch items newer than the stored head into a new segment, then the rest"""
+        self.metrics.misses.inc()
+        head = next(self._items(key, meta), None)
+        segment = meta.get('segments', 0) + 1
+        new_items = 0
+        with self.cache_backend.iter_write(key, segment=segment) as feed:
+            for item in func(*args, since=head):
+                if isinstance(item, Checkpoint):
+                    continue
+                self._feed_item(feed, item)
+                new_items += 1
+                yield item
+            feed.flush()
+        self.cache_backend.set_meta(key, self._refreshed(meta, segment, new_items))
+        yield from self._items(key, meta)
+
+    async def _aitems(
+        self, key: str, meta: AnyDict | None = None
+    ) -> AsyncIterator[Value]:
+        # the stored stream is read and loaded off the loop, a batch at a time
+        items = self._items(key, meta)
+        batch: list[Value]
+        try:
+            while batch := await offload_pinned(key, list, islice(items, ITEM_BATCH)):
+                for item in batch:
+                    yield item
+        finally:
+            await offload_pinned(key, items.close)
+
+    @asynccontextmanager
+    async def _awriting(self, key: str, **kwargs: Any) -> AsyncIterator[Feed]:
+        writing = self.cache_backend.iter_write(key, **kwargs)
+        feed = await offload_pinned(key, writing.__enter__)
+        try:
+            yield feed
+        except BaseException as e:  # pylint:disable=broad-except
+            if not await offload_pinned(
+                key, writing.__exit__, type(e), e, e.__traceback__
+            ):
+                raise
+        else:
+            await offload_pinned(key, writing.__exit__, None, None, None)
+
+    @staticmethod
+    def _record(record: StreamRecorder, batch: list[Yielded]) -> list[Value]:
+        return [item for item in batch if record(item)]
+
+    async def aiter_hit(
+        self, key: str, meta: AnyDict | None = None
+    ) -> AsyncIterator[Value]:
+        self.metrics.backend_hits.inc()
+        async for item in self._aitems(key, meta):
+            yield item
+
+    async def aiter_miss(
+        self,
+        key: str,
+        func: AsyncGeneratorFunc,
+        args: tuple[Any, ...],
+        meta: AnyDict | None,
+    ) -> AsyncIterator[Value]:
+        stored = 0
+        self.metrics.misses.inc()
+        if resume := self._resume_point(meta):
+            async for item in self._aitems(key, resume):
+                stored += 1
+                yield item
+            result = func(*args, resume_from=resume['checkpoint'])
+        else:
+            await offload_pinned(
+                key, self.cache_backend.set_meta, key, {'complete': False}
+            )
+            result = func(*args)
+        async with self._awriting(key, append=resume is not None) as feed:
+            record = await offload_pinned(
+                key, self._recorder, key, feed, stored, resume
+            )
+            async for batch in abatches(result, ITEM_BATCH):
+                for item in await offload_pinned(key, self._record, record, batch):
+                    yield item
+            await offload_pinned(key, record.complete)
+
+    async def aiter_refresh(
+        self,
+        key: str,
+        func: AsyncGeneratorFunc,
+        args: tuple[Any, ...],
+        meta: AnyDict,
+    ) -> AsyncIterator[Value]:
+        self.metrics.misses.inc()
+        head = await offload_pinned(key, next, self._items(key, meta), None)
+        segment = meta.get('segments', 0) + 1
+        new_items = 0
+        async with self._awriting(key, segment=segment) as feed:
+            async for batch in abatches(func(*args, since=head), ITEM_BATCH):
+                items = [item for item in batch if not isinstance(item, Checkpoint)]
+                await offload_pinned(key, self._feed_items, feed, items)
+                new_items += len(items)
+                for item in items:
+                    yield item
+            await offload_pinned(key, feed.flush)
+        meta_refreshed = self._refreshed(meta, segment, new_items)
+        await offload_pinned(key, self.cache_backend.set_meta, key, meta_refreshed)
+        async for item in self._aitems(key, meta):
+            yield item
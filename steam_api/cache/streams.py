@@ -0,0 +1,103 @@
+from time import perf_counter, time
+from typing import Any, AsyncIterator, Callable, Iterator, NamedTuple, TypeGuard
+
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.entries import Value
+from steam_api.cache.serializers import Feed
+from steam_api.common import AnyDict, AnyJson
+
+
+class Checkpoint(NamedTuple):
+    """Yielded by a cached generator between items to make its stream resumable.
+
+    Everything yielded before it is considered durable; after an interruption the
+    generator is called again with `resume_from=state` and its items are appended.
+    """
+
+    state: AnyDict
+
+
+# what cached generators yield: items, and checkpoints between them
+Yielded = Value | Checkpoint
+GeneratorFunc = Callable[..., Iterator[Yielded]]
+AsyncGeneratorFunc = Callable[..., AsyncIterator[Yielded]]
+
+
+class IncompleteStream(Exception):
+    pass
+
+
+async def abatches(
+    items: AsyncIterator[Yielded], size: int
+) -> AsyncIterator[list[Yielded]]:
+    """Items of a source up to each checkpoint, at most `size` at a time"""
+    batch: list[Yielded] = []
+    async for item in items:
+        batch.append(item)
+        if isinstance(item, Checkpoint) or len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StreamRecorder:
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        cache_backend: CacheBackend,
+        key: str,
+        feed: Feed,
+        dump: Callable[[Any], AnyJson],
+        *,
+        count: int = 0,
+        skip: int = 0,
+        stamp: AnyDict | None = None,
+        observe: Callable[[float], None] | None = None,
+    ):
+        self._backend = cache_backend
+        self._key = key
+        self._feed = feed
+        self._dump = dump
+        self.count = count
+        # items already stored by an interrupted run past its last checkpoint
+        self._skip = skip
+        # kept in every meta written, e.g. the schema version of the items
+        self._stamp = stamp or {}
+        # takes the seconds spent dumping and writing each item
+        self._observe = observe
+
+    def __call__(self, item: Value | Checkpoint) -> TypeGuard[Value]:
+        """Store the item; returns whether it should be passed on to the caller"""
+        if isinstance(item, Checkpoint):
+            self._feed.flush()
+            self._backend.set_meta(
+                self._key,
+                {
+                    'complete': False,
+                    'count': self.count,
+                    'checkpoint': item.state,
+                    **self._stamp,
+                },
+            )
+            return False
+        if self._skip:
+            self._skip -= 1
+            return False
+        start = perf_counter()
+        self._feed(self._dump(item))
+        if self._observe is not None:
+            self._observe(perf_counter() - start)
+        self.count += 1
+        return True
+
+    def complete(self) -> None:
+        self._feed.flush()
+        self._backend.set_meta(
+            self._key,
+            {
+                'complete': True,
+                'count': self.count,
+                'written_at': time(),
+                **self._stamp,
+            },
+        )
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from functools import cache
+from typing import Any, Type
+
+from pydantic import BaseModel
+from pydantic_core import SchemaValidator
+
+# schemas that build models or run user code, kept as they are
+KEEP = {
+    'model',
+    'dataclass',
+    'definition-ref',
+    'function-before',
+    'function-after',
+    'function-wrap',
+    'function-plain',
+}
+# containers of the kept ones, never replaced themselves
+WRAPPERS = {'model-fields', 'model-field', 'default', 'definitions'}
+SUBSCHEMA_KEYS = {
+    'schema',
+    'items_schema',
+    'keys_schema',
+    'values_schema',
+    'choices',
+    'definitions',
+}
+ANY = {'type': 'any'}
+
+
+@cache
+def schema_version(model: Type[BaseModel]) -> str:
+    """Stamp of the model's json schema; changes whenever stored data may not fit"""
+    schema = json.dumps(model.model_json_schema(by_alias=True), sort_keys=True)
+    return hashlib.sha1(schema.encode()).hexdigest()[:12]
+
+
+def _subschemas(schema: Any) -> list[Any]:
+    if isinstance(schema, list):
+        return schema
+    if not isinstance(schema, dict):
+        return []
+    subschemas = []
+    for key, value in schema.items():
+        if key == 'fields':
+            subschemas.extend(value.values())
+        elif key in SUBSCHEMA_KEYS:
+            subschemas.append(value)
+    return subschemas
+
+
+def _keeps(schema: Any) -> bool:
+    if isinstance(schema, dict) and schema.get('type') in KEEP:
+        return True
+    return any(_keeps(subschema) for subschema in _subschemas(schema))
+
+
+def _relax_value(key: str, value: Any) -> Any:
+    if key == 'fields':
+        return {name: _relax(field) for name, field in value.items()}
+    if key in SUBSCHEMA_KEYS:
+        return _relax(value)
+    return value
+
+
+def _relax(schema: Any) -> Any:
+    """`schema` with every subtree that builds no model accepting data as is"""
+    if isinstance(schema, list):
+        return [_relax(subschema) for subschema in schema]
+    if schema['type'] not in WRAPPERS and not _keeps(schema):
+        return ANY
+    return {key: _relax_value(key, value) for key, value in schema.items()}
+
+
+@cache
+def trusted_validator(model: Type[BaseModel]) -> SchemaValidator:
+    """Builds `model` instances from data it dumped itself, skipping type checks.
+
+    Instances are still created by pydantic-core, which stays cheaper than
+    constructing them from python; field validators still run.
+    """
+    return SchemaValidator(_relax(model.__pydantic_core_schema__))
@@ -0,0 +1,225 @@
+from functools import partial
+from time import perf_counter, time
+from typing import Any, Callable, Iterable, NamedTuple
+
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.entries import (
+    VALIDATORS_KEY,
+    CachedError,
+    EntryCodec,
+    NotModified,
+    Value,
+)
+from steam_api.cache.flight import Flights
+from steam_api.cache.memory import MISSING, MemoryCache, Missing, approx_size
+from steam_api.cache.metrics import CacheMetrics
+from steam_api.cache.offload import offload
+from steam_api.common import AnyDict
+
+# a stored result and its write time
+Found = tuple[Value | CachedError, float | None]
+# the cached function, or coroutine function
+Func = Callable[..., Any]
+
+
+class Expiry(NamedTuple):
+    """Seconds values stay fresh for; None: forever"""
+
+    ttl: float | None = None
+    negative_ttl: float | None = None
+
+    def expires(self, negative: bool = False) -> bool:
+        """Whether values, or remembered errors, go stale at all"""
+        return (self.negative_ttl if negative else self.ttl) is not None
+
+    def is_fresh(self, written_at: float | None, negative: bool = False) -> bool:
+        ttl = self.negative_ttl if negative else self.ttl
+        if ttl is None:
+            return True
+        # entries written before timestamps were recorded count as expired
+        return written_at is not None and time() - written_at < ttl
+
+
+class ValueCache:
+    """Stored results of a cached function or coroutine, with an optional
+    memory tier in front of the backend"""
+
+    def __init__(
+        self,
+        cache_backend: CacheBackend,
+        codec: EntryCodec,
+        metrics: CacheMetrics,
+        memory: MemoryCache | None = None,
+        expiry: Expiry = Expiry(),
+    ):
+        self.cache_backend = cache_backend
+        self.codec = codec
+        self.metrics = metrics
+        self.memory = memory
+        self.expiry = expiry
+        # whether the function takes the `validators` of the stored value
+        self.conditional = False
+        self.flights = Flights()
+
+    def written_at(self, key: str, negative: bool = False) -> float | None:
+        # without a ttl the write time is never looked at, spare the backend:
+        # with only `negative_ttl` set, hits on values cost no extra lookup
+        if not self.expiry.expires(negative):
+            return None
+        return self.cache_backend.written_at(key)
+
+    def lookup(self, key: str, fields: Iterable[str] | None = None) -> Found | Missing:
+        """Value and its write time from the memory tier or the backend,
+        `MISSING` if neither has it. With `fields` the value is a projection."""
+        found = self._remembered(key, fields)
+        return self._stored(key, fields) if found is MISSING else found
+
+    async def alookup(
+        self, key: str, fields: Iterable[str] | None = None
+    ) -> Found | Missing:
+        found = self._remembered(key, fields)
+        return await offload(self._stored, key, fields) if found is MISSING else found
+
+    def _remembered(
+        self, key: str, fields: Iterable[str] | None = None
+    ) -> Found | Missing:
+        if self.memory is None:
+            return MISSING
+        found = self.memory.get(key)
+        if found is not MISSING:
+            self.metrics.memory_hits.inc()
+            result, written_at = found
+            found = self.codec.project(result, fields), written_at
+        return found
+
+    def _stored(self, key: str, fields: Iterable[str] | None = None) -> Found | Missing:
+        if key in self.cache_backend:
+            found = self._hit(key, fields)
+            if found is not MISSING:
+                self.metrics.backend_hits.inc()
+            return found
+        return MISSING
+
+    def _hit(self, key: str, fields: Iterable[str] | None = None) -> Found | Missing:
+        start = perf_counter()
+        raw = self.cache_backend[key]
+        result = self.codec.load_entry(raw, fields)
+        self.metrics.load_seconds.observe(perf_counter() - start)
+        if result is MISSING:
+            return MISSING
+        found = result, self.written_at(key, isinstance(result, CachedError))
+        # the memory tier holds full values only
+        if self.memory is not None and not fields:
+            self.memory.put(key, found, approx_size(raw))
+        return found
+
+    def store(
+        self,
+        key: str,
+        result: Value | CachedError,
+        validators: AnyDict | None = None,
+    ) -> Value | CachedError:
+        start = perf_counter()
+        raw = self.codec.dump_entry(result)
+        self.cache_backend[key] = raw
+        self.metrics.dump_seconds.observe(perf_counter() - start)
+        written_at = time()
+        meta: AnyDict = {}
+        negative = isinstance(result, CachedError)
+        if self.expiry.expires(negative) and not self.cache_backend.TRACKS_WRITE_TIME:
+            meta['written_at'] = written_at
+        if validators or self.conditional and self._validators(key):
+            # the validators of a replaced value are void
+            meta[VALIDATORS_KEY] = validators or {}
+        if meta:
+            self.cache_backend.set_meta(key, meta)
+        if self.memory is not None:
+            self.memory.put(key, (result, written_at), approx_size(raw))
+        return result
+
+    def _touch(self, key: str) -> Value | CachedError | Missing:
+        """The stored result, marked as written now; `MISSING` if it is unusable"""
+        self.cache_backend.touch(key, time())
+        found = self._hit(key)
+        if found is MISSING:
+            return MISSING
+        self.metrics.revalidated.inc()
+        return found[0]
+
+    def _validators(self, key: str) -> AnyDict:
+        if key not in self.cache_backend:
+            return {}
+        return dict(self.cache_backend.get_meta(key).get(VALIDATORS_KEY, {}))
+
+    def _call(
+        self, func: Func, args: tuple[Any, ...], validators: AnyDict | None
+    ) -> Value | CachedError:
+        kwargs = {} if validators is None else {'validators': validators}
+        try:
+            return func(*args, **kwargs)
+        except self.codec.negative as e:
+            return CachedError(e)
+
+    async def _acall(
+        self, func: Func, args: tuple[Any, ...], validators: AnyDict | None
+    ) -> Value | CachedError:
+        kwargs = {} if validators is None else {'validators': validators}
+        try:
+            return await func(*args, **kwargs)
+        except self.codec.negative as e:
+            return CachedError(e)
+
+    def _fetch(
+        self, key: str, func: Func, args: tuple[Any, ...]
+    ) -> Value | CachedError:
+        if not self.conditional:
+            result = self._call(func, args, None)
+            self.metrics.misses.inc()
+            return self.store(key, result)
+        # filled with the validators of the new value by `func`
+        validators = self._validators(key)
+        try:
+            result = self._call(func, args, validators)
+        except NotModified:
+            if (touched := self._touch(key)) is not MISSING:
+                return touched
+            validators = {}
+            result = self._call(func, args, validators)
+        self.metrics.misses.inc()
+        return self.store(key, result, validators)
+
+    async def _afetch(
+        self, key: str, func: Func, args: tuple[Any, ...]
+    ) -> Value | CachedError:
+        if not self.conditional:
+            result = await self._acall(func, args, None)
+            self.metrics.misses.inc()
+            return await offload(self.store, key, result)
+        validators = await offload(self._validators, key)
+        try:
+            result = await self._acall(func, args, validators)
+        except NotModified:
+            if (touched := await offload(self._touch, key)) is not MISSING:
+                return touched
+            validators = {}
+            result = await self._acall(func, args, validators)
+        self.metrics.misses.inc()
+        return await offload(self.store, key, result, validators)
+
+    def fetch(self, key: str, func: Func, args: tuple[Any, ...]) -> Value | CachedError:
+        """Call `func` and store the result; concurrent calls for the same key
+        share a single call"""
+        return self.flights.share(key, partial(self._fetch, key, func, args))
+
+    async def afetch(
+        self, key: str, func: Func, args: tuple[Any, ...]
+    ) -> Value | CachedError:
+        return await self.flights.ashare(key, partial(self._afetch, key, func, args))
+
+    def revalidate(self, key: str, func: Func, args: tuple[Any, ...]) -> None:
+        """Refresh the entry on a background thread"""
+        self.flights.revalidate(key, partial(self._fetch, key, func, args))
+
+    def arevalidate(self, key: str, func: Func, args: tuple[Any, ...]) -> None:
+        """Refresh the entry in a background task of the running loop"""
+        self.flights.arevalidate(key, partial(self._afetch, key, func, args))
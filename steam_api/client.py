@@ -1,27 +1,36 @@
-from typing import Iterator, cast
+from functools import lru_cache
+from time import monotonic
+from typing import Iterator, Self
 
-import requests
-from requests import ConnectTimeout
-
-from steam_api.cache import cache
+from steam_api.cache import Checkpoint, cache
+from steam_api.cache.memory import MISSING, MemoryCache
 from steam_api.cache.serializers import SerializerJson
 from steam_api.common import AnyDict
-from steam_api.config import config
+from steam_api.endpoints import Endpoints, NotFound
+from steam_api.ratelimit import RateLimiter
 from steam_api.schemas import (
     App,
-    AppInfoResponse,
     OwnedGamesResponse,
     Review,
     ReviewsResponse,
     ReviewsSummary,
 )
-from steam_api.utils import retry
-
-CONN_TIMEOUT = 5
-READ_TIMEOUT = 10
-BACKOFF_TIMEOUT = 3
-
-TIMEOUT_TUPLE = (CONN_TIMEOUT, READ_TIMEOUT)
+from steam_api.transport import POOL_SIZE, Transport
+from steam_api.utils import JSON_CHUNK, iter_json_array
+
+# in-process tier in front of the disk cache: bytes of app info, review summaries
+APP_INFO_MEMORY = 256 << 20
+SUMMARIES_MEMORY = 100_000
+# review pages fetched for a summary, kept for the `get_reviews` that follows
+FIRST_PAGES = 64
+# seconds such a page stays current enough to start a download with
+FIRST_PAGE_MAX_AGE = 10
+# seconds before a cached entry is fetched again
+OWNED_GAMES_TTL = 24 * 3600
+SUMMARY_TTL = 6 * 3600
+ALL_APPS_TTL = 7 * 24 * 3600
+# delisted apps are asked about again after this long
+APP_NOT_FOUND_TTL = 3 * 24 * 3600
 
 
 class AppNotFound(Exception):
@@ -32,102 +41,155 @@ class ReviewCollision(Exception):
     pass
 
 
-class NotFound(Exception):
-    pass
+def unique_reviews(reviews: list[Review], ids: set[int]) -> Iterator[Review]:
+    for review in reviews:
+        if review.id in ids:
+            raise ReviewCollision((review.id, ids))
+        ids.add(review.id)
+        yield review
+
+
+def is_known(review: Review, newest: Review | None) -> bool:
+    # `filter=recent` pages newest first, by creation time
+    return newest is not None and (
+        review.id == newest.id or review.timestamp_created < newest.timestamp_created
+    )
 
 
 class Client:
     STORE_API = 'https://store.steampowered.com'
     STEAM_API = 'https://api.steampowered.com'
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = POOL_SIZE,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+    ):
         self.api_key = api_key
-
-    @cache('get_app_info', model=App)
-    def get_app_info(self, app_id: int) -> App:
-        # raise NotFound('disable fetch')
-        response = requests.get(
-            f'{self.STORE_API}/api/appdetails?appids={app_id}',
-            timeout=TIMEOUT_TUPLE,
+        self._transport = Transport(
+            (self.STORE_API, self.STEAM_API), pool_size, keep_alive, rate_limiter
         )
-        response.raise_for_status()
-        raw = AppInfoResponse.parse_raw(response.text)
-        assert set(raw.root) == {str(app_id)}
-        outer = raw.root[str(app_id)]
-        if not outer.success:
-            raise NotFound(f'app {app_id} retrieve failed')
-        if not outer.data:
-            raise NotFound(f'app {app_id} empty data')
-        return cast(App, outer.data)
-
-    @cache('player_owned_games', OwnedGamesResponse)
-    def get_player_owned_games(self, steam_id: int) -> OwnedGamesResponse:
-        response = requests.get(
-            url=f'{self.STEAM_API}/IPlayerService/GetOwnedGames/v0001/',
-            params={
-                'key': self.api_key,
-                'steamid': steam_id,
-                'format': 'json',
-            },
-            timeout=TIMEOUT_TUPLE,
+        self.endpoints = Endpoints(
+            self._transport, api_key, self.STORE_API, self.STEAM_API
         )
-        response.raise_for_status()
-        return OwnedGamesResponse.parse_obj(response.json()['response'])
+        self._first_pages = MemoryCache(FIRST_PAGES)
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @cache(
+        'get_app_info',
+        model=App,
+        memory=MemoryCache(None, APP_INFO_MEMORY),
+        negative=(NotFound,),
+        negative_ttl=APP_NOT_FOUND_TTL,
+        trusted=True,
+    )
+    def get_app_info(self, app_id: int, validators: AnyDict | None = None) -> App:
+        return self.endpoints.app_info(app_id, validators)
+
+    @cache(
+        'player_owned_games',
+        OwnedGamesResponse,
+        ttl=OWNED_GAMES_TTL,
+        stale_while_revalidate=True,
+    )
+    def get_player_owned_games(
+        self, steam_id: int, validators: AnyDict | None = None
+    ) -> OwnedGamesResponse:
+        return self.endpoints.player_owned_games(steam_id, validators)
 
     def get_total_reviews(self, app_id: int) -> int:
         return self.get_review_summary(app_id).total_reviews
 
-    @cache('review_summary', model=ReviewsSummary)
+    @cache(
+        'review_summary',
+        model=ReviewsSummary,
+        memory=MemoryCache(SUMMARIES_MEMORY),
+        ttl=SUMMARY_TTL,
+        stale_while_revalidate=True,
+    )
     def get_review_summary(self, app_id: int) -> ReviewsSummary:
-        return self._get_reviews(app_id).query_summary
-
-    @cache('reviews', model=Review)
-    def get_reviews(self, app_id: int) -> Iterator[Review]:
-        ids = set()
-        cursor = '*'
+        return self.summary_page(app_id).query_summary
+
+    def summary_page(self, app_id: int) -> ReviewsResponse:
+        """Page one of the reviews, fetched for its summary"""
+        batch = self.endpoints.reviews_page(app_id)
+        # `get_reviews` usually follows, it takes page one from here
+        self._first_pages.put(app_id, (batch, monotonic()), 1)
+        return batch
+
+    def first_review_page(self, app_id: int, reuse: bool = True) -> ReviewsResponse:
+        """Page one of the reviews; the page of a summary fetched just before
+        is taken unless `reuse` is off, e.g. when looking for new reviews"""
+        found = self._first_pages.get(app_id)
+        if found is not MISSING:
+            self._first_pages.discard(app_id)
+            batch, fetched_at = found
+            if reuse and monotonic() - fetched_at < FIRST_PAGE_MAX_AGE:
+                return batch
+        batch = self.endpoints.reviews_page(app_id)
+        # the summary comes with page one, spare `get_review_summary` a request
+        summaries = self.get_review_summary.cache  # type: ignore[attr-defined]
+        summaries.put(self, app_id, value=batch.query_summary)
+        return batch
+
+    @cache('reviews', model=Review, trusted=True)
+    def get_reviews(
+        self,
+        app_id: int,
+        *,
+        resume_from: AnyDict | None = None,
+        since: Review | None = None,
+    ) -> Iterator[Review | Checkpoint]:
+        """Reviews newest first; `get_reviews(app_id, refresh=True)` fetches new ones"""
+        ids: set[int] = set()
+        cursor = resume_from['cursor'] if resume_from else '*'
         while cursor:
-            batch = self._get_reviews(app_id, cursor=cursor)
+            if cursor == '*':
+                batch = self.first_review_page(app_id, reuse=since is None)
+            else:
+                batch = self.endpoints.reviews_page(app_id, cursor=cursor)
             if not batch.reviews:
                 break
-            for review in batch.reviews:
-                if review.id in ids:
-                    raise ReviewCollision((review.id, ids))
-                ids.add(review.id)
+            for review in unique_reviews(batch.reviews, ids):
+                if is_known(review, since):
+                    return
                 yield review
             cursor = batch.cursor
+            yield Checkpoint({'cursor': cursor})
         else:
             print('MISSING CURSOR')
 
-    @retry(ConnectTimeout, n=30, backoff_time=BACKOFF_TIMEOUT)
-    def _get_reviews(self, app_id: int, cursor: str = '*') -> ReviewsResponse:
-        response = requests.get(
-            f'{self.STORE_API}/appreviews/{app_id}',
-            params={
-                'json': 1,
-                'language': 'all',
-                # this means ordering, not filter. Cursor won't work with default 'all'
-                'filter': 'recent',
-                'review_type': 'all',
-                'appids': app_id,
-                'cursor': cursor,
-                'num_per_page': 100,
-                'filter_offtopic_activity': 0,
-            },
-            timeout=TIMEOUT_TUPLE,
-        )
-        response.raise_for_status()
-        result = ReviewsResponse.parse_obj(response.json())
-        assert result.success
-        return result
-
-    @cache('all_apps', key=None, serializer=SerializerJson())
-    def get_all_apps(self) -> list[AnyDict]:
-        response = requests.get(
-            f'{self.STEAM_API}/ISteamApps/GetAppList/v2/',
-            timeout=TIMEOUT_TUPLE,
+    @cache('all_apps', key=None, serializer=SerializerJson(), ttl=ALL_APPS_TTL)
+    def get_all_apps(self, validators: AnyDict | None = None) -> Iterator[AnyDict]:
+        """`{appid, name}` of every app, parsed and cached as the list downloads"""
+        response = self._transport.get_conditional(
+            self.STEAM_API, '/ISteamApps/GetAppList/v2/', validators, stream=True
         )
-        response.raise_for_status()
-        return response.json()['applist']['apps']
+        with response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(JSON_CHUNK), key='apps')
+
+
+@lru_cache(maxsize=None)
+def get_client() -> Client:
+    """The shared client, built with the configured api key on first use"""
+    # settings are only imported, and required, once a client is needed
+    from steam_api.config import get_config  # pylint:disable=import-outside-toplevel
+
+    return Client(get_config().STEAM_API_KEY)
 
 
-client = Client(config.STEAM_API_KEY)
+def __getattr__(name: str) -> Client:
+    if name == 'client':
+        return get_client()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
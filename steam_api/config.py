@@ -1,11 +1,11 @@
+from functools import cache
+
 import dotenv
 from pydantic_settings import BaseSettings
 
 from steam_api.common import ROOT
 
 env_file = ROOT / '.env'
-if env_file.exists():
-    dotenv.load_dotenv(env_file)
 
 
 class Config(BaseSettings):
@@ -13,4 +13,16 @@ class Config(BaseSettings):
     STEAM_MY_ID: int
 
 
-config = Config()
+@cache
+def get_config() -> Config:
+    """Settings from the environment and `.env`, read on first use"""
+    if env_file.exists():
+        dotenv.load_dotenv(env_file)
+    return Config()
+
+
+def __getattr__(name: str) -> Config:
+    # `config` stays importable, without failing imports when env vars are unset
+    if name == 'config':
+        return get_config()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
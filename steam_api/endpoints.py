@@ -0,0 +1,79 @@
+from steam_api.common import AnyDict
+from steam_api.schemas import (
+    App,
+    AppInfoResponse,
+    OwnedGamesEnvelope,
+    OwnedGamesResponse,
+    ReviewsResponse,
+)
+from steam_api.transport import Transport
+
+REVIEWS_PER_PAGE = 100
+
+
+class NotFound(Exception):
+    pass
+
+
+class Endpoints:
+    """Steam endpoints, requested as is: no caching, one response per call.
+    `validators` are those of `Transport.get_conditional`."""
+
+    def __init__(
+        self, transport: Transport, api_key: str, store_api: str, steam_api: str
+    ):
+        self._transport = transport
+        self._api_key = api_key
+        self._store_api = store_api
+        self._steam_api = steam_api
+
+    def app_info(self, app_id: int, validators: AnyDict | None = None) -> App:
+        response = self._transport.get_conditional(
+            self._store_api, f'/api/appdetails?appids={app_id}', validators
+        )
+        response.raise_for_status()
+        raw = AppInfoResponse.model_validate_json(response.content)
+        assert set(raw.root) == {str(app_id)}
+        outer = raw.root[str(app_id)]
+        if not outer.success:
+            raise NotFound(f'app {app_id} retrieve failed')
+        if not outer.data:
+            raise NotFound(f'app {app_id} empty data')
+        return outer.data
+
+    def player_owned_games(
+        self, steam_id: int, validators: AnyDict | None = None
+    ) -> OwnedGamesResponse:
+        response = self._transport.get_conditional(
+            self._steam_api,
+            '/IPlayerService/GetOwnedGames/v0001/',
+            validators,
+            params={
+                'key': self._api_key,
+                'steamid': steam_id,
+                'format': 'json',
+            },
+        )
+        response.raise_for_status()
+        return OwnedGamesEnvelope.model_validate_json(response.content).response
+
+    def reviews_page(self, app_id: int, cursor: str = '*') -> ReviewsResponse:
+        response = self._transport.get(
+            self._store_api,
+            f'/appreviews/{app_id}',
+            params={
+                'json': 1,
+                'language': 'all',
+                # this means ordering, not filter. Cursor won't work with default 'all'
+                'filter': 'recent',
+                'review_type': 'all',
+                'appids': app_id,
+                'cursor': cursor,
+                'num_per_page': REVIEWS_PER_PAGE,
+                'filter_offtopic_activity': 0,
+            },
+        )
+        response.raise_for_status()
+        result = ReviewsResponse.model_validate_json(response.content)
+        assert result.success
+        return result
@@ -0,0 +1,211 @@
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Generic, Iterator, TypeVar, cast
+
+from steam_api.common import AnyDict
+
+# upper bounds of histogram buckets, seconds; +Inf is implied
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+)
+
+V = TypeVar('V', 'CounterValue', 'HistogramValue')
+M = TypeVar('M', bound='Metric[Any]')
+
+
+class CounterValue:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> AnyDict:
+        return {'value': self.value}
+
+
+class HistogramValue:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # per bucket, not cumulative; the last one is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+    def snapshot(self) -> AnyDict:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, buckets = 0, {}
+        for bound, n in zip((*self.buckets, float('inf')), counts):
+            cumulative += n
+            buckets[bound] = cumulative
+        return {'count': cumulative, 'sum': total, 'buckets': buckets}
+
+
+class Metric(Generic[V]):
+    TYPE = ''
+
+    def __init__(self, name: str, help_: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], V] = {}
+        self._lock = threading.Lock()
+
+    def _new(self) -> V:
+        raise NotImplementedError
+
+    def labels(self, *values: object) -> V:
+        """The value for these label values; bind it once on hot paths"""
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f'{self.name} is labelled by {self.labelnames}')
+        if (value := self._values.get(key)) is None:
+            with self._lock:
+                value = self._values.setdefault(key, self._new())
+        return value
+
+    def snapshot(self) -> list[AnyDict]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            {**dict(zip(self.labelnames, key)), **value.snapshot()}
+            for key, value in values
+        ]
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def exposition(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.TYPE}'
+        for name, labels, value in self._samples():
+            yield f'{name}{_format_labels(labels)} {_format_value(value)}'
+
+
+class Counter(Metric[CounterValue]):
+    TYPE = 'counter'
+
+    def _new(self) -> CounterValue:
+        return CounterValue()
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for sample in self.snapshot():
+            value = sample.pop('value')
+            yield self.name, sample, value
+
+
+class Histogram(Metric[HistogramValue]):
+    TYPE = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_, labelnames)
+        self.buckets = buckets
+
+    def _new(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def _samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for sample in self.snapshot():
+            buckets, count, total = (sample.pop(k) for k in ('buckets', 'count', 'sum'))
+            for bound, cumulative in buckets.items():
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                yield f'{self.name}_bucket', {**sample, 'le': le}, cumulative
+            yield f'{self.name}_sum', sample, total
+            yield f'{self.name}_count', sample, count
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return f'{{{pairs}}}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: M) -> M:
+        with self._lock:
+            # modules reloaded in tests register the same metrics again
+            return cast(M, self._metrics.setdefault(metric.name, metric))
+
+    def counter(
+        self, name: str, help_: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, help_, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_, labelnames, buckets))
+
+    def stats(self) -> dict[str, list[AnyDict]]:
+        """Every metric by name: a sample per combination of label values"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.exposition()]
+        return '\n'.join(lines) + '\n'
+
+
+# metrics of the cache and the client; `stats()` is a snapshot of all of them,
+# `prometheus()` the same in the Prometheus text exposition format
+registry = Registry()
+counter = registry.counter
+histogram = registry.histogram
+stats = registry.stats
+prometheus = registry.prometheus
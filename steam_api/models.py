@@ -1,16 +1,22 @@
-from functools import cached_property
+from functools import cache, cached_property
+from itertools import islice
 from pathlib import Path
+from time import time
 from typing import Iterator, Self
 
 import yaml
 from pydantic import BaseModel
 
-from steam_api.cache import cache
-from steam_api.client import NotFound, client
+from steam_api.app_infos import get_app_infos
+from steam_api.client import ALL_APPS_TTL, NotFound, get_client
 from steam_api.common import ROOT
-from steam_api.config import config
+from steam_api.name_index import NameIndex, normalize
 from steam_api.schemas import App, OwnedGame, Review, ReviewsSummary
 
+NAME_INDEX = ROOT / 'cache' / 'app_names.idx'
+# names of the owned library, see `AppNameMap.rebuild`
+OWNED_NAME_INDEX = ROOT / 'cache' / 'owned_names.idx'
+
 
 class MyRate(BaseModel):
     annotation: dict[str, str]
@@ -44,7 +50,7 @@ class Game:
     def app_info(self) -> App | NotFound:
         if not self._app:
             try:
-                self._app = client.get_app_info(self.id)
+                self._app = get_client().get_app_info(self.id)
             except NotFound:
                 self._app = NotFound
         return self._app
@@ -52,12 +58,12 @@ class Game:
     @property
     def review_summary(self) -> ReviewsSummary:
         if not self._review_summary:
-            self._review_summary = client.get_review_summary(self.id)
+            self._review_summary = get_client().get_review_summary(self.id)
         return self._review_summary
 
     @classmethod
     def from_name(cls, name: str):
-        return cls(app_id=app_name_map[name])
+        return cls(app_id=get_app_name_map()[name])
 
     @property
     def total_played(self) -> int:
@@ -65,9 +71,19 @@ class Game:
 
     @cached_property
     def name(self) -> str:
-        if self.app_info is NotFound:
+        # names of a whole library are wanted at once, skip loading the descriptions
+        # pylint:disable=unexpected-keyword-arg
+        try:
+            app = self._app or get_client().get_app_info(self.id, fields={'name'})
+        except NotFound:
+            app = NotFound
+        return self._app_name(app)
+
+    @staticmethod
+    def _app_name(app: App | NotFound | None) -> str:
+        if not app or app is NotFound:
             return 'NOT FOUND'
-        return self.app_info.name.strip()
+        return app.name.strip()
 
     @property
     def total_reviews(self) -> int:
@@ -75,49 +91,126 @@ class Game:
 
     @classmethod
     def users_games(cls, steam_id: int):
-        owned_games = client.get_player_owned_games(steam_id).games
-        return [cls(game) for game in owned_games]
+        owned_games = get_client().get_player_owned_games(steam_id).games
+        # fetched in parallel, of the apps only names are loaded
+        apps = get_app_infos(
+            get_client(), (game.id for game in owned_games), fields={'name'}
+        )
+        games = [cls(game) for game in owned_games]
+        for game in games:
+            game.name = cls._app_name(apps.get(game.id))
+        return games
 
     @property
     def reviews(self) -> Iterator[Review]:
-        return client.get_reviews(self.id)
+        return get_client().get_reviews(self.id)
 
 
 class AppNameMap:
-    def __init__(self, correction_file: Path) -> None:
-        self._map = {}
+    """App ids by name: the index of all Steam apps, the owned library of
+    `steam_id` ahead of it, the correction file on top. A name shared by
+    several apps resolves to the owned one.
+
+    Listing the library fetches every owned app: its names are kept in an
+    index of their own, written by `rebuild` only."""
+
+    def __init__(
+        self,
+        correction_file: Path,
+        index_file: Path = NAME_INDEX,
+        owned_file: Path = OWNED_NAME_INDEX,
+        steam_id: int | None = None,
+    ) -> None:
         self._correction_file = correction_file
+        self._index_file = index_file
+        self._owned_file = owned_file
+        self._steam_id = steam_id
 
     def __getitem__(self, item: str) -> int:
-        return self.map[item]
+        if item in self.corrections:
+            return self.corrections[item]
+        if (app_id := self._normalized_corrections.get(normalize(item))) is not None:
+            return app_id
+        if self.owned is not None and (app_id := self.owned.get(item)) is not None:
+            return app_id
+        return self.index[item]
+
+    def search(self, prefix: str, limit: int = 20) -> list[tuple[str, int]]:
+        return list(islice(self.index.prefix(prefix), limit))
+
+    def rebuild(self) -> None:
+        """Index the app list and the owned library again"""
+        self._close()
+        self.index = NameIndex.build(self._index_file, get_client().get_all_apps())
+        if self._steam_id is not None:
+            games = Game.users_games(self._steam_id)
+            self.owned = NameIndex.build(
+                self._owned_file,
+                (
+                    {'appid': game.id, 'name': game.name}
+                    for game in games
+                    if game.name != 'NOT FOUND'
+                ),
+            )
+
+    def _close(self) -> None:
+        for name in ('index', 'owned'):
+            if index := self.__dict__.pop(name, None):
+                index.close()
 
-    @property
-    def map_(self):
-        if not self._map:
-            all_apps = client.get_all_apps()
-            _map = self._map
-            for item in all_apps:
-                app_id = item['appid']
-                name = item['name']
-                _map[name] = app_id
-            correction = yaml.safe_load(self._correction_file.read_text())
-            _map.update(correction)
-        return self._map
+    @cached_property
+    def corrections(self) -> dict[str, int]:
+        if not self._correction_file.exists():
+            return {}
+        return yaml.safe_load(self._correction_file.read_text()) or {}
 
-    @property
-    @cache('game_name_id_map', model=None, key=None)
-    def map(self):
-        map_ = {}
-        for game in Game.users_games(config.STEAM_MY_ID):
-            if game.name == 'NOT FOUND':
-                continue
-            map_[game.name] = game.id
-        return map_
+    @cached_property
+    def _normalized_corrections(self) -> dict[str, int]:
+        return {normalize(name): app_id for name, app_id in self.corrections.items()}
+
+    @cached_property
+    def owned(self) -> NameIndex | None:
+        # as last rebuilt, never fetched on a lookup
+        if not self._owned_file.exists():
+            return None
+        return NameIndex(self._owned_file)
+
+    @cached_property
+    def index(self) -> NameIndex:
+        # rebuilt as often as the app list itself is fetched again
+        try:
+            fresh = time() - self._index_file.stat().st_mtime < ALL_APPS_TTL
+        except FileNotFoundError:
+            fresh = False
+        if not fresh:
+            return NameIndex.build(self._index_file, get_client().get_all_apps())
+        return NameIndex(self._index_file)
 
     @cached_property
     def metrics(self):
         pass
 
 
-app_name_map = AppNameMap(correction_file=ROOT / 'data/name_to_id_correction.yml')
-my_rate = MyRate.load()
+@cache
+def get_app_name_map() -> AppNameMap:
+    from steam_api.config import get_config  # pylint:disable=import-outside-toplevel
+
+    return AppNameMap(
+        correction_file=ROOT / 'data/name_to_id_correction.yml',
+        steam_id=get_config().STEAM_MY_ID,
+    )
+
+
+@cache
+def get_my_rate() -> MyRate:
+    return MyRate.load()
+
+
+LAZY = {'app_name_map': get_app_name_map, 'my_rate': get_my_rate}
+
+
+def __getattr__(name: str):
+    # built on first use: importing the module reads no files and needs no settings
+    if name in LAZY:
+        return LAZY[name]()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,142 @@
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Final, Iterable, Iterator, Self
+
+from steam_api.common import AnyDict
+
+MAGIC = b'NIX1'
+# magic, number of records; then record offsets, then the records
+HEADER = struct.Struct('<4sI')
+# typecode of the record offsets, as stored
+OFFSET: Final = 'I'
+OFFSET_SIZE = array(OFFSET).itemsize
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(name: str) -> str:
+    """Case, accent and punctuation insensitive form of an app name"""
+    name = unicodedata.normalize('NFD', name.casefold())
+    name = ''.join(char for char in name if not unicodedata.combining(char))
+    return ' '.join(NON_WORD.sub(' ', name).split())
+
+
+class _Keys:
+    """Normalized names of the records, as a sequence for `bisect`"""
+
+    def __init__(self, index: 'NameIndex'):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i: int) -> bytes:
+        start, end = self._index.span(i)
+        return self._index.data[start : self._index.data.find(b'\t', start, end)]
+
+
+class NameIndex:
+    """Sorted on-disk index of app names, memory-mapped.
+
+    Records are `normalized\\tapp_id\\tname\\n`, ordered by normalized name,
+    then app id; an array of record offsets makes binary search possible
+    without reading the file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'rb')  # pylint:disable=consider-using-with
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a name index')
+        offsets_end = HEADER.size + (count + 1) * OFFSET_SIZE
+        self._offsets = memoryview(self.data)[HEADER.size : offsets_end].cast(OFFSET)
+        self._keys = _Keys(self)
+
+    @classmethod
+    def build(cls, path: Path, apps: Iterable[AnyDict]) -> Self:
+        """Write the index of `{'appid', 'name'}` items and open it"""
+        records = sorted(
+            (normalized.encode(), app['appid'], ' '.join(app['name'].split()))
+            for app in apps
+            if (normalized := normalize(app['name']))
+        )
+        offsets = array(OFFSET, [HEADER.size + (len(records) + 1) * OFFSET_SIZE])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            # records are written as they are encoded, offsets once all are known
+            f.seek(offsets[0])
+            for key, app_id, name in records:
+                record = b'%s\t%d\t%s\n' % (key, app_id, name.encode())
+                offsets.append(offsets[-1] + f.write(record))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, len(records)))
+            f.write(offsets.tobytes())
+        os.replace(tmp, path)
+        return cls(path)
+
+    def close(self) -> None:
+        self._offsets.release()
+        self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def span(self, i: int) -> tuple[int, int]:
+        return self._offsets[i], self._offsets[i + 1]
+
+    def record(self, i: int) -> tuple[str, int]:
+        """`(name, app_id)` of the i-th record"""
+        start, end = self.span(i)
+        _, app_id, name = self.data[start : end - 1].split(b'\t', 2)
+        return name.decode(), int(app_id)
+
+    def _matches(self, key: bytes) -> Iterator[int]:
+        i = bisect_left(self._keys, key)
+        while i < len(self) and self._keys[i] == key:
+            yield i
+            i += 1
+
+    def get(self, name: str) -> int | None:
+        """Id of the app called `name`, up to case and punctuation.
+
+        An exact spelling wins; otherwise the oldest (lowest id) app does.
+        """
+        found = None
+        for i in self._matches(normalize(name).encode()):
+            record_name, app_id = self.record(i)
+            if record_name == name:
+                return app_id
+            if found is None:
+                found = app_id
+        return found
+
+    def __getitem__(self, name: str) -> int:
+        if (app_id := self.get(name)) is None:
+            raise KeyError(name)
+        return app_id
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def prefix(self, prefix: str) -> Iterator[tuple[str, int]]:
+        """`(name, app_id)` of apps whose normalized name starts so, sorted"""
+        key = normalize(prefix).encode()
+        i = bisect_left(self._keys, key)
+        while i < len(self) and self._keys[i].startswith(key):
+            yield self.record(i)
+            i += 1
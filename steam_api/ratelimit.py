@@ -0,0 +1,93 @@
+import threading
+from email.utils import parsedate_to_datetime
+from time import monotonic, sleep, time
+from typing import Any
+
+DEFAULT_RATE = 4.0  # requests per second
+MIN_RATE = 0.1
+MAX_RATE = 20.0
+BURST = 5
+# additive increase / multiplicative decrease
+DECREASE_FACTOR = 0.5
+INCREASE_STEP = 0.5
+INCREASE_AFTER = 50  # successful requests in a row
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = BURST,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._blocked_until = 0.0
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until it is available; returns seconds waited"""
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            # tokens may go negative: each caller reserves its own slot in line
+            self._tokens -= 1
+            wait = max(self._blocked_until - now, -self._tokens / self.rate, 0.0)
+        if wait:
+            sleep(wait)
+        return wait
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            self._streak = 0
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(
+                    self._blocked_until, monotonic() + retry_after
+                )
+
+    def success(self) -> None:
+        with self._lock:
+            self._streak += 1
+            if self._streak >= INCREASE_AFTER:
+                self._streak = 0
+                self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+
+
+class RateLimiter:
+    """Token buckets per host, shared by every request of a client"""
+
+    def __init__(self, rates: dict[str, float] | None = None, **bucket_kwargs: Any):
+        self._rates = rates or {}
+        self._bucket_kwargs = bucket_kwargs
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                rate = self._rates.get(host, DEFAULT_RATE)
+                self._buckets[host] = TokenBucket(rate=rate, **self._bucket_kwargs)
+            return self._buckets[host]
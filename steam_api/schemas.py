@@ -18,6 +18,10 @@ class OwnedGamesResponse(BaseModel):
     games: list[OwnedGame]
 
 
+class OwnedGamesEnvelope(BaseModel):
+    response: OwnedGamesResponse
+
+
 class AppPriceOverview(BaseModel):
     currency: Literal[
         'RUB',
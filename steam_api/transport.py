@@ -0,0 +1,147 @@
+import re
+from http import HTTPStatus
+from time import perf_counter
+from typing import Any, Iterable
+
+import requests
+from requests import ConnectTimeout
+from requests.adapters import HTTPAdapter
+
+from steam_api.cache import NotModified
+from steam_api.common import AnyDict
+from steam_api.metrics import counter, histogram
+from steam_api.ratelimit import RateLimiter, parse_retry_after
+from steam_api.utils import retry
+
+CONN_TIMEOUT = 5
+READ_TIMEOUT = 10
+BACKOFF_TIMEOUT = 3
+MAX_BACKOFF = 60
+RETRIES = 30
+POOL_SIZE = 10
+# validators stored with a response: (response header, conditional request header)
+VALIDATORS = {
+    'etag': ('ETag', 'If-None-Match'),
+    'last_modified': ('Last-Modified', 'If-Modified-Since'),
+}
+
+TIMEOUT_TUPLE = (CONN_TIMEOUT, READ_TIMEOUT)
+# app ids and the like in paths, replaced to keep the number of endpoints bounded
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+REQUEST_SECONDS = histogram(
+    'steam_api_request_seconds',
+    'Requests to Steam until the response headers arrive',
+    ('endpoint',),
+)
+RESPONSES = counter(
+    'steam_api_responses_total',
+    'Responses by status code; the exception name if there was none',
+    ('endpoint', 'status'),
+)
+
+
+class RetryableHTTPError(requests.HTTPError):
+    def __init__(self, *args: Any, retry_after: float | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+def endpoint(path: str) -> str:
+    """`/appreviews/620?json=1` -> `/appreviews/:id`"""
+    return ID_SEGMENT.sub('/:id', path.partition('?')[0])
+
+
+class Transport:
+    """GET requests to Steam hosts: rate limited, retried, measured"""
+
+    def __init__(
+        self,
+        bases: Iterable[str],
+        pool_size: int = POOL_SIZE,
+        keep_alive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # one pooled session per host: connections are reused between calls and
+        # shared by threads; `pool_block` makes extra threads wait for a free
+        # connection instead of opening throwaway ones
+        self._sessions = {
+            base: self._make_session(pool_size, keep_alive) for base in bases
+        }
+
+    @staticmethod
+    def _make_session(pool_size: int, keep_alive: bool) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    @retry(
+        (ConnectTimeout, RetryableHTTPError),
+        n=RETRIES,
+        backoff_time=BACKOFF_TIMEOUT,
+        factor=2,
+        max_backoff=MAX_BACKOFF,
+        jitter=True,
+    )
+    def get(self, base: str, path: str, **kwargs: Any) -> requests.Response:
+        bucket = self.rate_limiter[base]
+        bucket.acquire()
+        label = endpoint(path)
+        start = perf_counter()
+        try:
+            response = self._sessions[base].get(
+                f'{base}{path}', timeout=TIMEOUT_TUPLE, **kwargs
+            )
+        except requests.RequestException as e:
+            RESPONSES.labels(label, type(e).__name__).inc()
+            raise
+        REQUEST_SECONDS.labels(label).observe(perf_counter() - start)
+        status = response.status_code
+        RESPONSES.labels(label, status).inc()
+        if status == HTTPStatus.TOO_MANY_REQUESTS or status >= 500:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if status == HTTPStatus.TOO_MANY_REQUESTS:
+                bucket.throttle(retry_after)
+            raise RetryableHTTPError(
+                f'{status} for url: {response.url}',
+                response=response,
+                retry_after=retry_after,
+            )
+        bucket.success()
+        return response
+
+    def get_conditional(
+        self, base: str, path: str, validators: AnyDict | None, **kwargs: Any
+    ) -> requests.Response:
+        """`get` sending the `validators` of the cached response.
+
+        Raises NotModified on a 304; otherwise `validators` are replaced with
+        those of the new response.
+        """
+        if validators is None:
+            return self.get(base, path, **kwargs)
+        headers = {
+            request_header: validators[name]
+            for name, (_, request_header) in VALIDATORS.items()
+            if name in validators
+        }
+        response = self.get(base, path, headers=headers, **kwargs)
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            response.close()
+            raise NotModified(f'{base}{path}')
+        validators.clear()
+        for name, (response_header, _) in VALIDATORS.items():
+            if value := response.headers.get(response_header):
+                validators[name] = value
+        return response
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
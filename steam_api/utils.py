@@ -1,26 +1,153 @@
+import codecs
+import json
+import random
+import re
 from time import sleep
-from typing import Callable, ParamSpec, Type, TypeVar
+from typing import Callable, Iterable, Iterator, ParamSpec, Type, TypeVar
+
+from steam_api.common import AnyJson
+from steam_api.metrics import counter
 
 T = TypeVar('T')
 P = ParamSpec('P')
 F = Callable[P, T]
+# bytes read at a time by streaming parsers
+JSON_CHUNK = 1 << 16
+SEPARATORS = re.compile(r'[\s,]*')
+WHITESPACE = re.compile(r'\s*')
+ITEM_END = re.compile(r'[\s,\]]')
+
+RETRIES = counter(
+    'steam_api_retries_total', 'Calls retried by `retry`', ('operation', 'error')
+)
+BACKOFF_SECONDS = counter(
+    'steam_api_backoff_seconds_total',
+    'Seconds slept by `retry` between attempts',
+    ('operation', 'error'),
+)
 
 
-def retry(
-    exc_type: Type[Exception], n: int = 3, backoff_time: int = 0
+def retry(  # pylint:disable=too-many-arguments
+    exc_type: Type[Exception] | tuple[Type[Exception], ...],
+    n: int = 3,
+    backoff_time: float = 0,
+    factor: float = 1,
+    max_backoff: float | None = None,
+    jitter: bool = False,
 ) -> Callable[[F], F]:
+    """Retry on `exc_type`, sleeping `backoff_time * factor ** attempt` in between.
+
+    With `jitter` the sleep is drawn uniformly from the upper half of that range.
+    An exception carrying a `retry_after` attribute never sleeps less than it asks.
+    """
+
     def decorator(f: F) -> F:
+        operation = f.__qualname__
+
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
             last_exception = exc_type
-            for _ in range(n):
+            delay = backoff_time
+            for attempt in range(n):
                 try:
                     return f(*args, **kwargs)
                 except exc_type as e:
                     last_exception = e
-                    print(f'retry {exc_type}... {backoff_time} sec')
-                    sleep(backoff_time)
+                    if attempt == n - 1:
+                        break
+                    sleep_time = random.uniform(delay / 2, delay) if jitter else delay
+                    sleep_time = max(sleep_time, getattr(e, 'retry_after', None) or 0)
+                    error = type(e).__name__
+                    print(f'retry {error}... {sleep_time:.1f} sec')
+                    RETRIES.labels(operation, error).inc()
+                    BACKOFF_SECONDS.labels(operation, error).inc(sleep_time)
+                    sleep(sleep_time)
+                    delay *= factor
+                    if max_backoff is not None:
+                        delay = min(delay, max_backoff)
             raise last_exception
 
         return wrapper
 
     return decorator
+
+
+class _ChunkReader:
+    """Text of byte chunks, decoded as more of it is needed; the text before
+    `pos` is consumed and dropped on the next chunk"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self.buf, self.pos, self.done = '', 0, False
+
+    def more(self) -> bool:
+        """Read the next chunk; False at the end of the stream"""
+        if self.done:
+            return False
+        chunk = next(self._chunks, None)
+        self.done = chunk is None
+        text = self._text.decode(chunk or b'', final=self.done)
+        self.buf, self.pos = self.buf[self.pos :] + text, 0
+        return True
+
+    def skip(self, separators: re.Pattern[str]) -> bool:
+        """Move past `separators`, which match the empty string too; False at
+        the end of the stream"""
+        while True:
+            found = separators.match(self.buf, self.pos)
+            assert found, separators
+            self.pos = found.end()
+            if self.pos < len(self.buf):
+                return True
+            if not self.more():
+                return False
+
+    def at(self, char: str) -> bool:
+        return self.buf[self.pos] == char
+
+    def find(self, pattern: re.Pattern[str], search: bool) -> bool:
+        """Move past the first match of `pattern`, at `pos` unless `search`"""
+        while not (
+            match := pattern.search(self.buf) if search else pattern.match(self.buf)
+        ):
+            if not self.more():
+                return False
+        self.pos = match.end()
+        return True
+
+
+def iter_json_array(
+    chunks: Iterable[bytes], key: str | None = None
+) -> Iterator[AnyJson]:
+    """Items of a JSON array, parsed one at a time as `chunks` arrive.
+
+    The array is the value of the first `key` member found in the document,
+    e.g. `apps` of `{"applist": {"apps": [...]}}`; without `key` it is the
+    document itself, and arrays following it (appended writes) are read too.
+    Only the item being parsed and one chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    reader = _ChunkReader(chunks)
+    start = re.compile(r'\s*\[' if key is None else rf'"{re.escape(key)}"\s*:\s*\[')
+    if not reader.find(start, search=key is not None):
+        raise ValueError(f'no {key or "top-level"} array in the stream')
+    while True:
+        if not reader.skip(SEPARATORS):
+            raise ValueError('unterminated array')
+        if reader.at(']'):
+            reader.pos += 1
+            if key is not None or not reader.skip(WHITESPACE) or not reader.at('['):
+                return
+            reader.pos += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(reader.buf, reader.pos)
+        except json.JSONDecodeError:
+            if reader.more():
+                continue
+            raise
+        # a number cut by the end of the buffer goes on in the next chunk
+        if not ITEM_END.match(reader.buf, end) and reader.more():
+            continue
+        reader.pos = end
+        yield item
@@ -0,0 +1,5 @@
+import os
+
+# settings are read on first use of the shared client and require these
+os.environ.setdefault('STEAM_API_KEY', '1234567890ABCDEF')
+os.environ.setdefault('STEAM_MY_ID', '1234567890')
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+from urllib.parse import parse_qs, urlparse
+
+from steam_api.common import AnyDict
+
+
+def make_app(app_id: int) -> AnyDict:
+    return {
+        'type': 'game',
+        'name': f'Game {app_id}',
+        'steam_appid': app_id,
+        'required_age': 0,
+        'is_free': False,
+        'detailed_description': '<p>detailed description</p>' * 20,
+        'about_the_game': '<p>about the game</p>' * 20,
+        'short_description': 'short description',
+        'supported_languages': 'English',
+        'header_image': f'https://cdn.example/{app_id}/header.jpg',
+        'capsule_image': f'https://cdn.example/{app_id}/capsule.jpg',
+        'capsule_imagev5': f'https://cdn.example/{app_id}/capsule_v5.jpg',
+        'pc_requirements': {'minimum': '<strong>Minimum:</strong>'},
+        'mac_requirements': [],
+        'linux_requirements': [],
+        'developers': ['Dev'],
+        'publishers': ['Pub'],
+        'platforms': {'windows': True, 'mac': False, 'linux': True},
+        'package_groups': [],
+        'categories': [{'id': 2, 'description': 'Single-player'}],
+        'screenshots': [{'id': i, 'path_full': f'/s/{i}.jpg'} for i in range(5)],
+        'release_date': {'coming_soon': False, 'date': '1 Jan, 2020'},
+        'support_info': {'url': '', 'email': ''},
+        'background': f'https://cdn.example/{app_id}/bg.jpg',
+        'background_raw': f'https://cdn.example/{app_id}/bg_raw.jpg',
+        'content_descriptors': {'ids': [], 'notes': None},
+    }
+
+
+def make_review(i: int) -> AnyDict:
+    return {
+        'recommendationid': str(100_000 + i),
+        'author': {
+            'steamid': str(76561198000000000 + i),
+            'num_games_owned': 100 + i % 50,
+            'num_reviews': 1 + i % 7,
+            'playtime_forever': 1000 + i,
+            'playtime_last_two_weeks': 0,
+            'playtime_at_review': 900 + i,
+            'last_played': 1_600_000_000 + i,
+        },
+        'language': 'english',
+        'review': f'review number {i}: ' + 'this game is fine. ' * (1 + i % 10),
+        'timestamp_created': 1_600_000_000 - i,
+        'timestamp_updated': 1_600_000_000 - i,
+        'voted_up': bool(i % 3),
+        'votes_up': i % 11,
+        'votes_funny': i % 5,
+        'weighted_vote_score': '0.5',
+        'comment_count': 0,
+        'steam_purchase': True,
+        'received_for_free': False,
+        'written_during_early_access': False,
+        'hidden_in_steam_china': True,
+        'steam_china_location': '',
+    }
+
+
+def reviews_summary(reviews: list[AnyDict]) -> AnyDict:
+    positive = sum(review['voted_up'] for review in reviews)
+    return {
+        'num_reviews': len(reviews),
+        'review_score': 7,
+        'review_score_desc': 'Mostly Positive',
+        'total_positive': positive,
+        'total_negative': len(reviews) - positive,
+        'total_reviews': len(reviews),
+    }
+
+
+class FakeSteam:
+    """Local stand-in for the store and Web API endpoints used by `Client`."""
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        apps: dict[int, AnyDict] | None = None,
+        reviews: dict[int, list[AnyDict]] | None = None,
+        page_size: int = 100,
+        latency: float = 0,
+        error_rate: float = 0,
+        throttle_rate: float = 0,
+        seed: int = 0,
+    ):
+        self.apps = apps or {}
+        self.reviews = reviews or {}
+        self.page_size = page_size
+        self.requests: list[str] = []
+        self.connections = 0
+        # (status, headers) served instead of the next responses
+        self.faults: list[tuple[int, dict[str, str]]] = []
+        # seconds before every response; shares of 503 and 429 responses
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.statuses: Counter[int] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, path_prefix: str) -> int:
+        return sum(path.startswith(path_prefix) for path in self.requests)
+
+    def _next_fault(self) -> tuple[int, dict[str, str]] | None:
+        if self.faults:
+            return self.faults.pop(0)
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429, {'Retry-After': '1'}
+        if roll < self.throttle_rate + self.error_rate:
+            return 503, {}
+        return None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:  # noqa: N802
+                url = urlparse(self.path)
+                with fake._lock:
+                    fake.requests.append(url.path)
+                    fault = fake._next_fault()
+                headers = {}
+                if fault:
+                    (status, headers), body = fault, {}
+                else:
+                    status, body = fake.route(url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode()
+                if status == 200:
+                    headers['ETag'] = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+                    if self.headers.get('If-None-Match') == headers['ETag']:
+                        status, payload = 304, b''
+                with fake._lock:
+                    fake.statuses[status] += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def route(self, path: str, query: dict[str, list[str]]) -> tuple[int, AnyDict]:
+        if path == '/api/appdetails':
+            app_id = int(query['appids'][0])
+            if app_id not in self.apps:
+                return 200, {str(app_id): {'success': False}}
+            return 200, {str(app_id): {'success': True, 'data': self.apps[app_id]}}
+        if path.startswith('/appreviews/'):
+            return 200, self._reviews_page(int(path.rsplit('/', 1)[1]), query)
+        if path == '/IPlayerService/GetOwnedGames/v0001/':
+            games = [
+                {
+                    'appid': app_id,
+                    'playtime_forever': app_id,
+                    'playtime_windows_forever': app_id,
+                    'playtime_mac_forever': 0,
+                    'playtime_linux_forever': 0,
+                    'rtime_last_played': 0,
+                    'playtime_disconnected': 0,
+                }
+                for app_id in self.apps
+            ]
+            return 200, {'response': {'game_count': len(games), 'games': games}}
+        if path == '/ISteamApps/GetAppList/v2/':
+            apps = [
+                {'appid': app_id, 'name': app['name']}
+                for app_id, app in self.apps.items()
+            ]
+            return 200, {'applist': {'apps': apps}}
+        return 404, {}
+
+    def _reviews_page(self, app_id: int, query: dict[str, list[str]]) -> AnyDict:
+        reviews = self.reviews.get(app_id, [])
+        cursor = query.get('cursor', ['*'])[0]
+        start = 0 if cursor == '*' else int(cursor)
+        page = reviews[start : start + self.page_size]
+        summary = (
+            reviews_summary(reviews) if cursor == '*' else {'num_reviews': len(page)}
+        )
+        return {
+            'success': 1,
+            'query_summary': summary,
+            'reviews': page,
+            'cursor': str(start + len(page)),
+        }
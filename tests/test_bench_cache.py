@@ -0,0 +1,69 @@
+import tracemalloc
+
+import pytest
+
+from steam_api.cache import Cache
+from steam_api.cache.serializers import SerializerJson, SerializerJsonl
+from steam_api.schemas import App, Review
+
+from tests.fake_steam import make_app
+from tests.utils import bench_size, best_of, cached_reviews, report
+
+
+@pytest.mark.benchmark
+def test_trusted_hits(tmp_path):
+    apps = [App.model_validate(make_app(i)) for i in range(bench_size(200))]
+    reviews = [Review.model_validate(data) for data in cached_reviews(bench_size(1000))]
+    rows = {}
+    for trusted in (False, True):
+        cacher = Cache(tmp_path / str(trusted))
+
+        @cacher('apps', App, 'all_str', SerializerJson(), trusted=trusted)
+        def get_app(i):
+            return apps[i]
+
+        @cacher('reviews', Review, None, SerializerJsonl(), trusted=trusted)
+        def get_reviews():
+            yield from reviews
+
+        for i in range(len(apps)):
+            get_app(i)
+        list(get_reviews())
+        app_hits = best_of(lambda: [get_app(i) for i in range(len(apps))])
+        review_hits = best_of(lambda: list(get_reviews()))
+        assert [get_app(i) for i in range(len(apps))] == apps
+        assert list(get_reviews()) == reviews
+        rows['trusted' if trusted else 'validated'] = (
+            len(apps) / app_hits,
+            len(reviews) / review_hits,
+        )
+    report('cache hits', ('apps/s', 'reviews/s'), rows)
+
+
+def held_bytes(load) -> int:
+    """Memory allocated by `load` and still held by its result"""
+    tracemalloc.start()
+    result = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+@pytest.mark.benchmark
+def test_projection_memory(tmp_path):
+    apps = [App.model_validate(make_app(i)) for i in range(bench_size(200))]
+
+    @Cache(tmp_path)('apps', App, 'all_str', SerializerJson(), trusted=True)
+    def get_app(i):
+        return apps[i]
+
+    for i in range(len(apps)):
+        get_app(i)
+    full = held_bytes(lambda: [get_app(i) for i in range(len(apps))])
+    slim = held_bytes(lambda: [get_app(i, fields={'name'}) for i in range(len(apps))])
+    report(
+        f'app info held in memory, {len(apps)} apps',
+        ('KiB',),
+        {'full': (full / 1024,), 'name only': (slim / 1024,)},
+    )
@@ -0,0 +1,84 @@
+from itertools import product
+from time import perf_counter
+
+import pytest
+
+from steam_api import ratelimit, utils
+from steam_api.app_infos import get_app_infos
+from steam_api.cache.backends import CacheFiles
+from steam_api.cache.log import CacheLog
+from steam_api.cache.serializers import SerializerJson, SerializerJsonl, SerializerYaml
+from steam_api.cache.sqlite import CacheSqlite
+from steam_api.client import Client
+from steam_api.ratelimit import RateLimiter
+
+from tests.fake_steam import FakeSteam, make_app, make_review
+from tests.utils import bench_size, isolate_cache, report, save_results
+
+BACKENDS = {'files': CacheFiles, 'sqlite': CacheSqlite, 'log': CacheLog}
+SERIALIZERS = {
+    'yaml': SerializerYaml(),
+    'json': SerializerJson(),
+    'jsonl': SerializerJsonl(),
+}
+REVIEWS = 250
+
+
+@pytest.fixture(scope='module')
+def fake_steam():
+    apps = {app_id: make_app(app_id) for app_id in range(10, 10 + bench_size(100))}
+    reviews = {
+        app_id: [make_review(i) for i in range(REVIEWS)]
+        for app_id in list(apps)[: bench_size(5)]
+    }
+    # a slow, flaky server: every retry is counted, backoff sleeps are skipped
+    with FakeSteam(
+        apps, reviews, latency=0.002, error_rate=0.02, throttle_rate=0.01
+    ) as server:
+        yield server
+
+
+def crawl(client: Client, fake_steam: FakeSteam) -> int:
+    """What a crawl job does; returns the number of items it got"""
+    games = client.get_player_owned_games(1).games
+    names = {app['appid']: app['name'] for app in client.get_all_apps()}
+    apps = get_app_infos(client, (game.id for game in games))
+    assert names.keys() == apps.keys()
+    items = len(apps)
+    for app_id in fake_steam.reviews:
+        assert client.get_review_summary(app_id).total_reviews == REVIEWS
+        items += sum(1 for _ in client.get_reviews(app_id))
+    return items
+
+
+@pytest.mark.benchmark
+def test_crawl(fake_steam, tmp_path, monkeypatch):
+    backoffs: list[float] = []
+    monkeypatch.setattr(utils, 'sleep', backoffs.append)
+    monkeypatch.setattr(ratelimit, 'sleep', lambda _: None)
+    monkeypatch.setattr(Client, 'STORE_API', fake_steam.url)
+    monkeypatch.setattr(Client, 'STEAM_API', fake_steam.url)
+    rows = {}
+    for (backend, backend_class), (serializer, serializer_instance) in product(
+        BACKENDS.items(), SERIALIZERS.items()
+    ):
+        path = tmp_path / f'{backend}-{serializer}'
+        timings = []
+        retries = len(backoffs)
+        for _ in ('cold', 'warm'):
+            # a fresh process each time: in-memory tiers start empty
+            isolate_cache(monkeypatch, path, backend_class, serializer_instance)
+            rate_limiter = RateLimiter(rates={fake_steam.url: 1000}, max_rate=1000)
+            with Client('key', rate_limiter=rate_limiter) as client:
+                start = perf_counter()
+                items = crawl(client, fake_steam)
+                timings.append(perf_counter() - start)
+        cold, warm = timings
+        rows[f'{backend}/{serializer}'] = (
+            items / cold,
+            items / warm,
+            len(backoffs) - retries,
+        )
+    header = ('cold/s', 'warm/s', 'retries')
+    report(f'crawl of {items} items', header, rows)
+    save_results('crawl', header, rows)
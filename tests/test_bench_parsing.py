@@ -0,0 +1,83 @@
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pydantic import BaseModel
+
+from steam_api.schemas import AppInfoResponse, OwnedGamesEnvelope, ReviewsResponse
+from steam_api.utils import JSON_CHUNK, iter_json_array
+
+from tests.utils import bench_size, best_of, report
+
+
+class AppList(BaseModel):
+    apps: list[dict]
+
+
+# the whole GetAppList payload in one model, as it was parsed before streaming
+class AppListResponse(BaseModel):
+    applist: AppList
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+PAYLOADS = {
+    'appdetails': AppInfoResponse,
+    'appreviews': ReviewsResponse,
+    'owned_games': OwnedGamesEnvelope,
+    'app_list': AppListResponse,
+}
+REPEAT = 20
+
+
+@pytest.mark.benchmark
+def test_response_parsing():
+    rows = {}
+    for name, model in PAYLOADS.items():
+        content = (FIXTURES / f'{name}.json').read_bytes()
+        # the way responses were parsed before: `response.json()`, then validation
+        two_pass = best_of(
+            lambda: [model.model_validate(json.loads(content)) for _ in range(REPEAT)]
+        )
+        from_bytes = best_of(
+            lambda: [model.model_validate_json(content) for _ in range(REPEAT)]
+        )
+        assert model.model_validate_json(content) == model.model_validate(
+            json.loads(content)
+        )
+        rows[name] = (
+            len(content) // 1024,
+            REPEAT / two_pass,
+            REPEAT / from_bytes,
+        )
+    # review pages are what crawler workers parse all day
+    report('response parsing', ('KiB', 'json+model/s', 'bytes/s'), rows)
+
+
+def peak_bytes(parse: Callable[[], object]) -> int:
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+@pytest.mark.benchmark
+def test_app_list_streaming():
+    apps = [{'appid': i, 'name': f'Game number {i}'} for i in range(bench_size(50_000))]
+    content = json.dumps({'applist': {'apps': apps}}).encode()
+    chunks = [content[i : i + JSON_CHUNK] for i in range(0, len(content), JSON_CHUNK)]
+
+    def whole():
+        return len(AppListResponse.model_validate_json(content).applist.apps)
+
+    def streamed():
+        return sum(1 for _ in iter_json_array(chunks, key='apps'))
+
+    assert whole() == streamed() == len(apps)
+    rows = {
+        'whole': (peak_bytes(whole) / 1024, len(apps) / best_of(whole)),
+        'streamed': (peak_bytes(streamed) / 1024, len(apps) / best_of(streamed)),
+    }
+    report(f'app list, {len(content) // 1024} KiB', ('peak KiB', 'apps/s'), rows)
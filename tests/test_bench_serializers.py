@@ -0,0 +1,74 @@
+import pytest
+
+from steam_api.cache.serializers import (
+    CODECS,
+    Compressed,
+    SerializerJsonl,
+    SerializerYaml,
+)
+
+from tests.utils import bench_size, best_of, cached_reviews, report
+
+SERIALIZERS = {
+    'yaml': SerializerYaml(),
+    'jsonl': SerializerJsonl(fast=False),
+    'jsonl-fast': SerializerJsonl(),
+}
+
+
+@pytest.fixture(scope='module')
+def reviews():
+    return cached_reviews(bench_size(100))
+
+
+def write_stream(serializer, path, items):
+    with serializer.iter_write(path) as feed:
+        for item in items:
+            feed(item)
+
+
+@pytest.mark.benchmark
+def test_review_stream(reviews, tmp_path):
+    rows = {}
+    for name, serializer in SERIALIZERS.items():
+        path = tmp_path / f'{name}.{serializer.EXT}'
+        write = best_of(lambda: write_stream(serializer, path, reviews))
+        read = best_of(lambda: list(serializer.iter(path)))
+        assert list(serializer.iter(path)) == reviews
+        rows[name] = (
+            len(reviews) / write,
+            len(reviews) / read,
+            path.stat().st_size // 1024,
+        )
+    report(
+        f'review stream, {len(reviews)} items',
+        ('write/s', 'read/s', 'KiB'),
+        rows,
+    )
+
+
+@pytest.mark.benchmark
+def test_compression(tmp_path):
+    reviews = cached_reviews(bench_size(1000))
+    rows = {}
+    for codec in ('none', *CODECS):
+        serializer = SerializerJsonl()
+        if codec != 'none':
+            serializer = Compressed(serializer, codec)
+        path = tmp_path / f'reviews.{serializer.EXT}'
+        write = best_of(lambda: write_stream(serializer, path, reviews), repeat=1)
+        read = best_of(lambda: list(serializer.iter(path)))
+        assert list(serializer.iter(path)) == reviews
+        rows[codec] = (
+            len(reviews) / write,
+            len(reviews) / read,
+            path.stat().st_size // 1024,
+        )
+    report(
+        f'jsonl review stream, {len(reviews)} items',
+        ('write/s', 'read/s', 'KiB'),
+        rows,
+    )
+    assert all(
+        row[2] < rows['none'][2] / 3 for name, row in rows.items() if name != 'none'
+    )
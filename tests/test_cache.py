@@ -1,13 +1,31 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from itertools import islice
 from pathlib import Path
 from shutil import rmtree
 
 import pytest
-
-from steam_api.cache import Cache
-from steam_api.cache.backends import CacheOneFile
-from steam_api.cache.serializers import SerializerJson, SerializerYaml
-
+import yaml
+
+from steam_api.cache import Cache, Checkpoint, NotModified
+from steam_api.cache.backends import READ_BYTES, WRITTEN_BYTES, CacheOneFile
+from steam_api.cache.log import CacheLog
+from steam_api.cache.memory import MISSING, MemoryCache
+from steam_api.cache.metrics import (
+    CACHE_DUMP_SECONDS,
+    CACHE_HITS,
+    CACHE_LOAD_SECONDS,
+    CACHE_MISSES,
+)
+from steam_api.cache.serializers import (
+    Compressed,
+    SerializerJson,
+    SerializerJsonl,
+    SerializerYaml,
+)
+from steam_api.cache.sqlite import CacheSqlite
 from tests.utils import TestDatum
 
 
@@ -123,6 +141,16 @@ def test_cache_singleton(func_no_args, cacher, cache_path):
     assert (cache_path / 'prefix.json').read_text() == '{"name": "a"}'
 
 
+def test_cache_dirs_made_on_write(func_one_arg, cacher, cache_path):
+    @cacher('prefix', key='all_str', model=TestDatum)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    assert not cache_path.exists()
+    foo('ARG')
+    assert (cache_path / 'prefix' / 'ARG.yml').exists()
+
+
 def test_cache_method(cached_method, cache_path):
     cached_method('a', 'b')
     cached_method('a', 'c')
@@ -168,10 +196,153 @@ def test_key_self_id(cached_method_id_key, cache_path):
     assert (cache_path / 'prefix' / 'some_id.yml').read_text() == "name: '1'\n"
 
 
+@pytest.fixture()
+def resumable_func(cacher):
+    calls = []
+
+    @cacher('prefix', TestDatum, 'all_str')
+    def foo(arg, *, resume_from=None):
+        start = resume_from['next'] if resume_from else 0
+        calls.append(start)
+        for page in range(start, 3):
+            for i in range(2):
+                if calls == [0] and (page, i) == (1, 1):
+                    raise ConnectionError
+                yield TestDatum(name=f'{page}.{i}', arg=arg)
+            yield Checkpoint({'next': page + 1})
+
+    return foo, calls
+
+
+def test_generator_resume(resumable_func, cache_path):
+    foo, calls = resumable_func
+    expected = [TestDatum(name=f'{i // 2}.{i % 2}', arg='x') for i in range(6)]
+    received = []
+    with pytest.raises(ConnectionError):
+        received.extend(foo('x'))
+    assert received == expected[:3]
+    assert 'x' not in foo.cache
+
+    assert list(foo('x')) == expected
+    # the item stored past the checkpoint is not duplicated
+    assert list(foo('x')) == expected
+    assert calls == [0, 1]
+    assert (cache_path / 'prefix' / 'x.yml').read_text().count('- ') == 6
+
+
+def test_generator_abandoned(generator_func):
+    assert next(generator_func('arg')) == TestDatum(name='0', arg='arg')
+    assert 'arg' not in generator_func.cache
+    assert list(generator_func('arg')) == [
+        TestDatum(name=str(i), arg='arg') for i in range(1, 4)
+    ]
+    assert 'arg' in generator_func.cache
+
+
+def test_generator_refresh(cacher, cache_path):
+    source = ['c', 'b', 'a']
+
+    @cacher('prefix', TestDatum, 'all_str')
+    def foo(arg, *, since=None):
+        for name in source:
+            if since and name == since.name:
+                return
+            yield TestDatum(name=name, arg=arg)
+
+    assert [item.name for item in foo('x')] == ['c', 'b', 'a']
+    source[:0] = ['e', 'd']
+    assert [item.name for item in foo('x')] == ['c', 'b', 'a']
+    assert [item.name for item in foo('x', refresh=True)] == ['e', 'd', 'c', 'b', 'a']
+    source[:0] = ['f']
+    assert [item.name for item in foo('x', refresh=True)] == list('fedcba')
+    assert [item.name for item in foo('x', refresh=True)] == list('fedcba')
+    assert [item.name for item in foo('x')] == list('fedcba')
+    # the base entry is never rewritten
+    assert (cache_path / 'prefix' / 'x.yml').read_text().count('- ') == 3
+    assert foo.cache.stream_meta('x')['segments'] == 2
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_generator_jsonl(cacher, cache_path, fast):
+    @cacher('prefix', TestDatum, 'all_str', SerializerJsonl(fast=fast))
+    def foo(arg):
+        for name in ('ä', 'b'):
+            yield TestDatum(name=name, arg=arg)
+
+    assert (
+        list(foo('x'))
+        == list(foo('x'))
+        == [
+            TestDatum(name='ä', arg='x'),
+            TestDatum(name='b', arg='x'),
+        ]
+    )
+    assert (
+        cache_path / 'prefix' / 'x.jsonl'
+    ).read_text() == '{"name":"ä","arg":"x"}\n{"name":"b","arg":"x"}\n'
+
+
+def test_generator_json(cacher, cache_path):
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson())
+    def foo(arg):
+        for name in ('ä', 'b'):
+            yield TestDatum(name=name, arg=arg)
+
+    expected = [TestDatum(name='ä', arg='x'), TestDatum(name='b', arg='x')]
+    assert list(foo('x')) == list(foo('x')) == expected
+    # a plain JSON list, loadable as a whole too
+    assert SerializerJson().load(cache_path / 'prefix' / 'x.json') == [
+        {'name': 'ä', 'arg': 'x'},
+        {'name': 'b', 'arg': 'x'},
+    ]
+
+
+@pytest.mark.parametrize(
+    ('serializer', 'ext'),
+    [
+        (Compressed(SerializerJsonl()), 'jsonl.gz'),
+        (Compressed(SerializerYaml(), 'bz2'), 'yml.bz2'),
+        (Compressed(SerializerJsonl(fast=False), 'lzma'), 'jsonl.xz'),
+    ],
+)
+def test_compressed(cacher, cache_path, func_one_arg, serializer, ext):
+    @cacher('prefix', TestDatum, 'all_str', serializer)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    @cacher('stream', TestDatum, 'all_str', serializer)
+    def bar(arg, *, resume_from=None):
+        yield TestDatum(name='0', arg=arg)
+        yield Checkpoint({})
+        yield TestDatum(name='1', arg=arg)
+
+    assert foo('x') == foo('x') == TestDatum(name='a', arg='x')
+    assert (cache_path / 'prefix' / f'x.{ext}').exists()
+    stream = bar('x')
+    next(stream)
+    stream.close()
+    # resuming appends a second compressed member to the file
+    expected = [TestDatum(name='0', arg='x'), TestDatum(name='1', arg='x')]
+    assert list(bar('x')) == list(bar('x')) == expected
+    assert serializer.loads(serializer.dumps([{'a': 1}])) == [{'a': 1}]
+
+
 def test_iter_empty_yaml(empty_yml):
     assert list(SerializerYaml()._yaml_chunks(empty_yml)) == []
 
 
+def test_iter_yaml_batches(empty_yml, monkeypatch):
+    items = [{'name': str(i), 'tags': ['a', 'b'], 'text': 'x ' * 100} for i in range(7)]
+    # written item by item with the pure python dumper, as older caches were
+    empty_yml.write_text(
+        ''.join(yaml.dump([item], allow_unicode=True) for item in items)
+    )
+    chunks = list(SerializerYaml()._yaml_chunks(empty_yml, items=3))
+    assert [len(yaml.safe_load(chunk)) for chunk in chunks] == [3, 3, 1]
+    monkeypatch.setattr(SerializerYaml, 'BATCH_SIZE', 2)
+    assert list(SerializerYaml().iter(empty_yml)) == items
+
+
 def test_cache_one_file(func_one_arg, cacher, cache_path):
     @cacher('prefix', TestDatum, 'all_str', cache_backend=CacheOneFile)
     def foo(*args):
@@ -192,3 +363,606 @@ def test_cache_one_file(func_one_arg, cacher, cache_path):
         return func_one_arg(*args)
 
     assert foo('b') == TestDatum(name='a', arg='b')
+
+
+def test_cache_one_file_interrupted(cacher, cache_path, monkeypatch):
+    @cacher('prefix', model=None, key='all_str', cache_backend=CacheOneFile)
+    def foo(arg):
+        return arg
+
+    foo('b')
+    stored = (cache_path / 'prefix.yml').read_text()
+
+    def torn_dump(path, data):
+        path.write_text('c: ')
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(SerializerYaml, 'dump', staticmethod(torn_dump))
+    with pytest.raises(KeyboardInterrupt):
+        foo('c')
+    # the other keys survive a write cut short
+    assert (cache_path / 'prefix.yml').read_text() == stored
+
+
+async def test_cache_async(cacher, func_one_arg):
+    @cacher('prefix', key='all_str', model=TestDatum)
+    async def foo(arg):
+        return func_one_arg(arg)
+
+    @cacher('gen_prefix', key='all_str', model=TestDatum)
+    async def bar(arg):
+        for i in range(3):
+            yield TestDatum(name=func_one_arg(arg).name, arg=str(i))
+
+    assert await foo('x') == await foo('x') == TestDatum(name='a', arg='x')
+    expected = [TestDatum(name=name, arg=str(i)) for i, name in enumerate('123')]
+    assert [item async for item in bar('x')] == expected
+    assert [item async for item in bar('x')] == expected
+
+
+async def test_cache_async_off_loop(cacher, func_one_arg):
+    loop_thread = threading.get_ident()
+    threads = set()
+
+    class Recording(CacheSqlite):
+        def __getitem__(self, key):
+            threads.add(threading.get_ident())
+            return super().__getitem__(key)
+
+        def __setitem__(self, key, value):
+            threads.add(threading.get_ident())
+            super().__setitem__(key, value)
+
+        def get_meta(self, key):
+            threads.add(threading.get_ident())
+            return super().get_meta(key)
+
+        def iter(self, key, segments=0):
+            threads.add(threading.get_ident())
+            return super().iter(key, segments)
+
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson(), Recording)
+    async def foo(arg):
+        return func_one_arg(arg)
+
+    @cacher('stream', TestDatum, 'all_str', SerializerJson(), Recording, ttl=60)
+    async def bar(arg, *, resume_from=None, since=None):
+        for i in range(250):
+            if since and since.name == str(i):
+                return
+            yield TestDatum(name=str(i), arg=arg)
+            if i % 100 == 99:
+                yield Checkpoint({'i': i})
+
+    assert await foo('x') == await foo('x')
+    expected = [str(i) for i in range(250)]
+    assert [item.name async for item in bar('x')] == expected
+    assert [item.name async for item in bar('x')] == expected
+    assert [item.name async for item in bar('x', refresh=True)] == expected
+    assert threads and loop_thread not in threads
+
+
+async def test_cache_async_io_concurrent(cacher):
+    # both hits read the backend at once, or neither gets past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    class Blocking(CacheSqlite):
+        def __getitem__(self, key):
+            barrier.wait()
+            return super().__getitem__(key)
+
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson(), Blocking)
+    async def foo(arg):
+        return TestDatum(name=arg)
+
+    await foo('a')
+    await foo('b')
+    results = await asyncio.gather(foo('a'), foo('b'))
+    assert [item.name for item in results] == ['a', 'b']
+
+
+def test_cache_sqlite(func_one_arg, cacher, cache_path):
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson(), CacheSqlite)
+    def foo(*args):
+        return func_one_arg(*args)
+
+    @cacher('stream', TestDatum, 'all_str', SerializerJson(), CacheSqlite)
+    def bar(arg, *, since=None):
+        for i in range(1200):
+            if since and since.name == str(i):
+                return
+            yield TestDatum(name=str(i), arg=arg)
+
+    assert foo('b') == foo('b') == TestDatum(name='a', arg='b')
+    assert foo('c') == TestDatum(name='1', arg='c')
+    assert [item.name for item in bar('x')] == [str(i) for i in range(1200)]
+    assert [item.name for item in bar('x')] == [str(i) for i in range(1200)]
+    assert 'x' in bar.cache and 'y' not in bar.cache
+    meta = bar.cache.cache_backend.get_meta('x')
+    assert meta['complete'] and meta['count'] == 1200
+    assert list(bar('x', refresh=True))[:2] == list(bar('x'))[:2]
+    assert (cache_path / 'cache.sqlite3').exists()
+
+
+def test_cache_log(func_one_arg, cacher, cache_path, monkeypatch):
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson(), CacheLog)
+    def foo(*args):
+        return func_one_arg(*args)
+
+    log_file = cache_path / 'prefix.json.log'
+    foo('b')
+    foo('c')
+    assert (
+        log_file.read_text()
+        == 'v\t"b"\t25\n{"name": "a", "arg": "b"}\n'
+        'v\t"c"\t25\n{"name": "1", "arg": "c"}\n'
+    )
+    foo.cache.cache_backend['b'] = {'name': 'z'}
+    assert foo('b') == TestDatum(name='z')
+    assert foo('c') == TestDatum(name='1', arg='c')
+
+    # a record torn by a crash is dropped on open
+    with open(log_file, 'ab') as f:
+        f.write(b'v\t"d"\t100\n{"name": ')
+    reopened = CacheLog(cache_path / 'prefix', SerializerJson())
+    assert 'd' not in reopened and reopened['b'] == {'name': 'z'}
+
+    monkeypatch.setattr(CacheLog, 'COMPACT_MIN_BYTES', 0)
+    reopened['c'] = {'name': 'y'}
+    assert (
+        log_file.read_text() == 'v\t"b"\t13\n{"name": "z"}\nv\t"c"\t13\n{"name": "y"}\n'
+    )
+    assert CacheLog(cache_path / 'prefix', SerializerJson())['c'] == {'name': 'y'}
+
+
+def test_cache_log_keys(tmp_path):
+    backend = CacheLog(tmp_path / 'prefix', SerializerJson())
+    keys = ['a', 'name\twith tab', 'two\nlines', 'pokémon', 'c']
+    for i, key in enumerate(keys):
+        backend[key] = {'i': i}
+    reopened = CacheLog(tmp_path / 'prefix', SerializerJson())
+    assert [reopened[key] for key in keys] == [{'i': i} for i in range(len(keys))]
+
+    # damage in the middle of the log is not mistaken for a torn last record
+    log_file = tmp_path / 'prefix.json.log'
+    size = log_file.stat().st_size
+    log_file.write_bytes(log_file.read_bytes().replace(b'tab"\t8', b'tab" 8'))
+    with pytest.raises(ValueError):
+        'a' in CacheLog(tmp_path / 'prefix', SerializerJson())
+    assert log_file.stat().st_size == size
+
+
+def test_memory_cache():
+    memory = MemoryCache(max_entries=2, max_bytes=100)
+    memory.put('a', 1, 10)
+    memory.put('b', 2, 10)
+    assert memory.get('a') == 1
+    memory.put('c', 3, 10)
+    assert memory.get('b') is MISSING
+    memory.put('d', 4, 95)
+    assert len(memory) == 1 and memory.get('d') == 4
+    assert memory.stats() == {
+        'entries': 1,
+        'bytes': 95,
+        'hits': 2,
+        'misses': 1,
+        'evictions': 3,
+    }
+
+
+def test_cache_memory_tier(cacher, func_one_arg, monkeypatch):
+    @cacher('prefix', TestDatum, 'all_str', memory=MemoryCache(max_entries=1))
+    def foo(arg):
+        return func_one_arg(arg)
+
+    assert foo('x') == TestDatum(name='a', arg='x')
+    reads = []
+    backend = foo.cache.cache_backend
+    monkeypatch.setattr(
+        type(backend),
+        '__getitem__',
+        lambda self, key: reads.append(key) or {'name': key},
+    )
+    assert foo('x') is foo('x')
+    assert reads == []
+    foo('y')
+    assert foo('x') == TestDatum(name='x')
+    assert reads == ['x']
+    assert foo('y', refresh=True) == TestDatum(name='2', arg='y')
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """Shift the cache's notion of now by `clock[0]` seconds"""
+    offset = [0.0]
+    now = time.time
+    for module in ('value_cache', 'stream_cache'):
+        monkeypatch.setattr(f'steam_api.cache.{module}.time', lambda: now() + offset[0])
+    return offset
+
+
+@pytest.mark.parametrize('backend', [None, CacheSqlite, CacheLog])
+def test_cache_ttl(cacher, func_one_arg, backend):
+    # real time: plain files take the write time from their mtime
+    kwargs = {'cache_backend': backend} if backend else {}
+
+    @cacher('prefix', TestDatum, 'all_str', SerializerJson(), ttl=0.2, **kwargs)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    assert foo('x') == foo('x') == TestDatum(name='a', arg='x')
+    time.sleep(0.25)
+    assert foo('x') == foo('x') == TestDatum(name='1', arg='x')
+
+
+def test_cache_ttl_memory_tier(cacher, func_one_arg, clock):
+    @cacher('prefix', TestDatum, 'all_str', memory=MemoryCache(), ttl=60)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    assert foo('x') is foo('x')
+    clock[0] = 61
+    assert foo('x').name == '1'
+
+
+def test_cache_stale_while_revalidate(cacher, clock):
+    calls = []
+    release = threading.Event()
+
+    @cacher(
+        'prefix',
+        TestDatum,
+        'all_str',
+        SerializerJson(),
+        CacheSqlite,
+        ttl=60,
+        stale_while_revalidate=True,
+    )
+    def foo(arg):
+        calls.append(arg)
+        if len(calls) > 1:
+            release.wait(5)
+        return TestDatum(name=str(len(calls)), arg=arg)
+
+    assert foo('x').name == '1'
+    clock[0] = 61
+    # stale values come back at once, only one refresh runs per key
+    assert foo('x').name == foo('x').name == '1'
+    # pending refreshes do not hold up exit
+    refreshing = [t for t in threading.enumerate() if t.name.startswith('revalidate')]
+    assert refreshing and all(t.daemon for t in refreshing)
+    release.set()
+    deadline = time.monotonic() + 5
+    while foo('x').name == '1' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert foo('x').name == '2'
+    assert calls == ['x', 'x']
+
+
+async def test_cache_stale_while_revalidate_async(cacher, func_one_arg, clock):
+    @cacher(
+        'prefix',
+        TestDatum,
+        'all_str',
+        SerializerJson(),
+        CacheSqlite,
+        ttl=60,
+        stale_while_revalidate=True,
+    )
+    async def foo(arg):
+        return func_one_arg(arg)
+
+    assert (await foo('x')).name == 'a'
+    clock[0] = 61
+    assert (await foo('x')).name == 'a'
+    await asyncio.gather(*foo.cache.values.flights._tasks)
+    assert (await foo('x')).name == '1'
+
+
+def test_generator_ttl(cacher, clock):
+    source = ['b', 'a']
+
+    @cacher('prefix', TestDatum, 'all_str', ttl=60)
+    def foo(arg, *, since=None):
+        for name in source:
+            if since and name == since.name:
+                return
+            yield TestDatum(name=name, arg=arg)
+
+    assert [item.name for item in foo('x')] == ['b', 'a']
+    source.insert(0, 'c')
+    assert [item.name for item in foo('x')] == ['b', 'a']
+    clock[0] = 61
+    assert [item.name for item in foo('x')] == ['c', 'b', 'a']
+    # the refresh restarted the clock
+    source.insert(0, 'd')
+    assert [item.name for item in foo('x')] == ['c', 'b', 'a']
+
+
+@pytest.fixture()
+def versioned():
+    """A source answering conditional calls: a version is its ETag"""
+    source = {'version': 1, 'calls': 0}
+
+    def fetch(validators):
+        source['calls'] += 1
+        etag = str(source['version'])
+        if validators.get('etag') == etag:
+            raise NotModified
+        validators.clear()
+        validators['etag'] = etag
+        return f'v{etag}'
+
+    return source, fetch
+
+
+@pytest.mark.parametrize('backend', [None, CacheSqlite])
+def test_cache_conditional(cacher, clock, backend, versioned):
+    source, fetch = versioned
+    kwargs = {'cache_backend': backend} if backend else {}
+
+    @cacher('prefix', TestDatum, 'all_str', ttl=60, **kwargs)
+    def foo(arg, validators=None):
+        return TestDatum(name=fetch(validators), arg=arg)
+
+    assert foo('x').name == 'v1'
+    assert foo.cache.cache_backend.get_meta('x')['validators'] == {'etag': '1'}
+    clock[0] = 61
+    # not modified: the stored value counts as fresh again
+    assert foo('x').name == 'v1'
+    assert foo('x').name == 'v1'
+    assert source['calls'] == 2
+    source['version'] = 2
+    assert foo('x', refresh=True).name == 'v2'
+    assert foo.cache.cache_backend.get_meta('x')['validators'] == {'etag': '2'}
+    # a value stored by hand voids them
+    foo.cache.put('x', value=TestDatum(name='v0'))
+    assert foo('x', refresh=True).name == 'v2'
+    assert source['calls'] == 4
+
+
+def test_generator_conditional(cacher, clock, versioned):
+    source, fetch = versioned
+
+    @cacher('prefix', TestDatum, 'all_str', ttl=60)
+    def foo(arg, validators=None):
+        version = fetch(validators)
+        for name in 'ab':
+            yield TestDatum(name=f'{version}{name}', arg=arg)
+
+    assert [item.name for item in foo('x')] == ['v1a', 'v1b']
+    clock[0] = 61
+    assert [item.name for item in foo('x')] == ['v1a', 'v1b']
+    assert [item.name for item in foo('x')] == ['v1a', 'v1b']
+    assert source['calls'] == 2
+    source['version'] = 2
+    assert [item.name for item in foo('x', refresh=True)] == ['v2a', 'v2b']
+    assert [item.name for item in foo('x')] == ['v2a', 'v2b']
+    assert foo.cache.stream_meta('x')['validators'] == {'etag': '2'}
+
+
+class Gone(Exception):
+    pass
+
+
+@pytest.mark.parametrize('backend', [None, CacheSqlite])
+def test_cache_negative(cacher, clock, backend, monkeypatch):
+    calls = []
+    kwargs = {'cache_backend': backend} if backend else {}
+
+    @cacher(
+        'prefix',
+        TestDatum,
+        'all_str',
+        SerializerJson(),
+        negative=(Gone,),
+        negative_ttl=60,
+        **kwargs,
+    )
+    def foo(arg):
+        calls.append(arg)
+        if arg == 'gone':
+            raise Gone(f'{arg} is gone')
+        if arg == 'broken':
+            raise ValueError(arg)
+        return TestDatum(name=arg)
+
+    for _ in range(2):
+        with pytest.raises(Gone, match='gone is gone'):
+            foo('gone')
+        with pytest.raises(ValueError):
+            foo('broken')
+    assert calls == ['gone', 'broken', 'broken']
+    # values have no ttl, only errors expire
+    assert foo('x') == TestDatum(name='x')
+    backend = foo.cache.cache_backend
+    looked_up = []
+    written_at = backend.written_at
+    monkeypatch.setattr(
+        backend, 'written_at', lambda key: looked_up.append(key) or written_at(key)
+    )
+    clock[0] = 61
+    assert foo('x') == TestDatum(name='x')
+    # so hits on values spare the backend the write time
+    assert not looked_up
+    with pytest.raises(Gone):
+        foo('gone')
+    assert calls == ['gone', 'broken', 'broken', 'x', 'gone']
+    assert looked_up == ['gone']
+
+
+def test_cache_negative_remembered(cacher, func_one_arg):
+    @cacher('prefix', TestDatum, 'all_str', memory=MemoryCache(), negative=(Gone,))
+    def foo(arg):
+        return func_one_arg(arg)
+
+    foo.cache.remember_error('x', Gone('x'))
+    with pytest.raises(Gone):
+        foo('x')
+    with pytest.raises(Gone):
+        foo('x')
+    assert foo('x', refresh=True) == TestDatum(name='a', arg='x')
+
+    # errors of types no longer cached negatively are fetched again
+    @cacher('prefix', TestDatum, 'all_str')
+    def bar(arg):
+        return func_one_arg(arg)
+
+    bar.cache.cache_backend['y'] = {'__error__': {'type': 'Gone', 'args': ['y']}}
+    assert bar('y') == TestDatum(name='1', arg='y')
+
+
+def test_cache_trusted(cacher, func_one_arg, monkeypatch):
+    @cacher('prefix', TestDatum, 'all_str', trusted=True)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    @cacher('stream', TestDatum, 'all_str', trusted=True)
+    def bar(arg):
+        yield from (TestDatum(name=str(i), arg=arg) for i in range(3))
+
+    assert foo('x') == TestDatum(name='a', arg='x')
+    assert list(bar('x')) == [TestDatum(name=str(i), arg='x') for i in range(3)]
+    validated = []
+    original = TestDatum.model_validate
+    monkeypatch.setattr(
+        TestDatum,
+        'model_validate',
+        lambda data: validated.append(data) or original(data),
+    )
+    assert foo('x') == TestDatum(name='a', arg='x')
+    assert list(bar('x')) == [TestDatum(name=str(i), arg='x') for i in range(3)]
+    assert validated == []
+    # a different model version validates as usual
+    foo.cache.codec.schema = bar.cache.codec.schema = 'other'
+    assert foo('x') == TestDatum(name='a', arg='x')
+    assert next(bar('x')) == TestDatum(name='0', arg='x')
+    assert len(validated) == 2
+
+
+@pytest.mark.parametrize('trusted', [False, True])
+def test_cache_projection(cacher, func_one_arg, trusted):
+    @cacher('prefix', TestDatum, 'all_str', memory=MemoryCache(), trusted=trusted)
+    def foo(arg):
+        return func_one_arg(arg)
+
+    slim = foo('x', fields={'arg'})
+    assert slim.model_dump() == {'arg': 'x'}
+    assert type(slim).__name__ == 'TestDatum[arg]'
+    assert foo('x') == TestDatum(name='a', arg='x')
+    foo.cache.memory.discard('x')
+    assert foo('x', fields=['name']).model_dump() == {'name': 'a'}
+    assert len(foo.cache.memory) == 0
+    assert foo('x', fields={'name'}).model_dump() == {'name': 'a'}
+    with pytest.raises(ValueError, match='no fields'):
+        foo('x', fields={'nope'})
+
+
+def test_cache_single_flight(cacher):
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    @cacher('prefix', TestDatum, 'all_str')
+    def foo(arg):
+        calls.append(arg)
+        started.set()
+        release.wait(5)
+        return TestDatum(name=str(len(calls)), arg=arg)
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(foo, 'x')
+        started.wait(5)
+        rest = [pool.submit(foo, 'x') for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in (first, *rest)]
+    assert calls == ['x']
+    assert results == [TestDatum(name='1', arg='x')] * 4
+
+
+async def test_cache_single_flight_async(cacher):
+    calls = []
+
+    @cacher('prefix', TestDatum, 'all_str')
+    async def foo(arg):
+        calls.append(arg)
+        await asyncio.sleep(0.01)
+        if arg == 'bad':
+            raise ValueError(arg)
+        return TestDatum(name=str(len(calls)), arg=arg)
+
+    results = await asyncio.gather(*(foo('x') for _ in range(4)))
+    assert results == [TestDatum(name='1', arg='x')] * 4
+    results = await asyncio.gather(
+        *(foo('bad') for _ in range(2)), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert calls == ['x', 'bad']
+
+
+def test_generator_single_flight(cacher):
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    @cacher('stream', TestDatum, 'all_str')
+    def foo(arg):
+        calls.append(arg)
+        started.set()
+        release.wait(5)
+        yield from (TestDatum(name=str(i), arg=arg) for i in range(3))
+
+    with ThreadPoolExecutor(4) as pool:
+        first = pool.submit(list, foo('x'))
+        started.wait(5)
+        rest = [pool.submit(list, foo('x')) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in (first, *rest)]
+    assert calls == ['x']
+    assert all(result == results[0] for result in results)
+    assert [item.name for item in results[0]] == ['0', '1', '2']
+
+
+async def test_generator_single_flight_async(cacher):
+    calls = []
+
+    @cacher('stream', TestDatum, 'all_str')
+    async def foo(arg):
+        calls.append(arg)
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield TestDatum(name=str(i), arg=arg)
+
+    async def collect():
+        return [item async for item in foo('x')]
+
+    results = await asyncio.gather(*(collect() for _ in range(4)))
+    assert calls == ['x']
+    assert [[item.name for item in result] for result in results] == [
+        ['0', '1', '2']
+    ] * 4
+
+
+def test_cache_metrics(cacher):
+    def readings():
+        return (
+            CACHE_HITS.labels('metered', 'memory').value,
+            CACHE_HITS.labels('metered', 'backend').value,
+            CACHE_MISSES.labels('metered').value,
+            CACHE_LOAD_SECONDS.labels('metered').snapshot()['count'],
+            CACHE_DUMP_SECONDS.labels('metered').snapshot()['count'],
+            READ_BYTES.labels('metered').value,
+            WRITTEN_BYTES.labels('metered').value,
+        )
+
+    def foo(arg):
+        return TestDatum(name='a', arg=arg)
+
+    before = readings()
+    with_memory = cacher('metered', TestDatum, 'all_str', memory=MemoryCache())(foo)
+    with_memory('x')
+    with_memory('x')
+    cacher('metered', TestDatum, 'all_str')(foo)('x')
+    deltas = [now - then for now, then in zip(readings(), before)]
+    size = (cacher.path / 'metered' / 'x.yml').stat().st_size
+    assert deltas == [1, 1, 1, 1, 1, size, size]
@@ -0,0 +1,239 @@
+import asyncio
+import json
+from time import monotonic
+
+import pytest
+
+import steam_api.client
+from steam_api import ratelimit, utils
+from steam_api.app_infos import get_app_infos, iter_app_infos
+from steam_api.async_client import AsyncClient
+from steam_api.client import FIRST_PAGE_MAX_AGE, Client, NotFound
+from steam_api.ratelimit import RateLimiter, TokenBucket, parse_retry_after
+from steam_api.transport import REQUEST_SECONDS, RESPONSES, RetryableHTTPError
+
+from tests.fake_steam import FakeSteam, make_app, make_review
+from tests.utils import isolate_cache
+
+
+@pytest.fixture()
+def fake_steam():
+    apps = {app_id: make_app(app_id) for app_id in (10, 20, 30)}
+    reviews = {10: [make_review(i) for i in range(250)]}
+    with FakeSteam(apps, reviews) as server:
+        yield server
+
+
+@pytest.fixture()
+def isolated_cache(tmp_path, monkeypatch):
+    isolate_cache(monkeypatch, tmp_path)
+    return tmp_path
+
+
+@pytest.fixture()
+def rate_limiter(fake_steam):
+    return RateLimiter(rates={fake_steam.url: 1000}, max_rate=1000)
+
+
+@pytest.fixture()
+def client(fake_steam, isolated_cache, rate_limiter, monkeypatch):
+    monkeypatch.setattr(Client, 'STORE_API', fake_steam.url)
+    monkeypatch.setattr(Client, 'STEAM_API', fake_steam.url)
+    with Client('key', rate_limiter=rate_limiter) as fake_client:
+        yield fake_client
+
+
+@pytest.fixture()
+async def async_client(client, rate_limiter):
+    async with AsyncClient('key', 4, rate_limiter) as fake_client:
+        yield fake_client
+
+
+@pytest.fixture()
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(utils, 'sleep', slept.append)
+    monkeypatch.setattr(ratelimit, 'sleep', lambda _: None)
+    return slept
+
+
+def test_connections_reused(client, fake_steam):
+    for app_id in (10, 20, 30):
+        assert client.get_app_info(app_id).id == app_id
+    assert len(list(client.get_reviews(10))) == 250
+    assert len(fake_steam.requests) == 3 + 4
+    assert fake_steam.connections == 1
+
+
+async def test_async_client(async_client, client, fake_steam):
+    apps = await asyncio.gather(*(async_client.get_app_info(i) for i in (10, 20, 30)))
+    assert [app.id for app in apps] == [10, 20, 30]
+    reviews = [review async for review in async_client.get_reviews(10)]
+    assert len(reviews) == 250
+    assert (await async_client.get_review_summary(10)).total_reviews == 250
+
+    requests_made = len(fake_steam.requests)
+    # cache entries are shared with the sync client
+    assert client.get_app_info(20) == apps[1]
+    assert list(client.get_reviews(10)) == reviews
+    assert len(fake_steam.requests) == requests_made
+
+
+def test_retry_throttled(client, fake_steam, rate_limiter, sleeps):
+    fake_steam.faults = [(429, {'Retry-After': '7'}), (503, {}), (502, {})]
+    assert client.get_app_info(10).id == 10
+    assert len(fake_steam.requests) == 4
+    assert sleeps[0] == 7
+    assert 1.5 <= sleeps[1] <= 6 and 3 <= sleeps[2] <= 12
+    assert rate_limiter[fake_steam.url].rate == 500
+
+
+def test_retry_gives_up(client, fake_steam, sleeps):
+    fake_steam.faults = [(500, {})] * 30
+    with pytest.raises(RetryableHTTPError):
+        client.get_app_info(10)
+    assert len(sleeps) == 29
+    assert max(sleeps) <= 60
+
+
+def test_random_faults(client, fake_steam, sleeps):
+    fake_steam.error_rate = fake_steam.throttle_rate = 0.3
+    apps = get_app_infos(client, [10, 20, 30])
+    assert sorted(apps) == [10, 20, 30]
+    assert fake_steam.statuses[200] == 3
+    assert len(sleeps) == fake_steam.statuses[429] + fake_steam.statuses[503] > 0
+
+
+def test_request_metrics(client, fake_steam, sleeps):
+    def readings():
+        return (
+            RESPONSES.labels('/api/appdetails', 200).value,
+            RESPONSES.labels('/api/appdetails', 503).value,
+            REQUEST_SECONDS.labels('/api/appdetails').snapshot()['count'],
+            utils.RETRIES.labels('Transport.get', 'RetryableHTTPError').value,
+            utils.BACKOFF_SECONDS.labels('Transport.get', 'RetryableHTTPError').value,
+        )
+
+    before = readings()
+    fake_steam.faults = [(503, {}), (503, {})]
+    assert client.get_app_info(10).id == 10
+    deltas = [now - then for now, then in zip(readings(), before)]
+    assert deltas == [1, 2, 3, 2, pytest.approx(sum(sleeps))]
+
+
+def test_token_bucket(monkeypatch):
+    bucket = TokenBucket(rate=10, burst=2, max_rate=10.5)
+    assert bucket.acquire() == bucket.acquire() == 0
+    waits = []
+    monkeypatch.setattr(ratelimit, 'sleep', waits.append)
+    bucket.acquire()
+    assert waits == [pytest.approx(0.1, abs=0.01)]
+
+    bucket.throttle()
+    assert bucket.rate == 5
+    for _ in range(50):
+        bucket.success()
+    assert bucket.rate == 5.5
+    assert parse_retry_after('12') == 12
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+
+
+def test_reviews_resume(client, fake_steam):
+    reviews = client.get_reviews(10)
+    for _ in range(150):
+        next(reviews)
+    reviews.close()
+    assert fake_steam.count('/appreviews/') == 2
+
+    assert len({review.id for review in client.get_reviews(10)}) == 250
+    # resumed from the cursor after the first page: pages 2, 3 and the empty one
+    assert fake_steam.count('/appreviews/') == 5
+    assert 10 in client.get_reviews.cache
+
+
+def test_reviews_refresh(client, fake_steam):
+    assert len(list(client.get_reviews(10))) == 250
+    newest = [make_review(-i) for i in range(1, 6)][::-1]
+    fake_steam.reviews[10][:0] = newest
+    pages = fake_steam.count('/appreviews/')
+
+    reviews = list(client.get_reviews(10, refresh=True))
+    assert len(reviews) == 255
+    assert [review.id for review in reviews[:5]] == [100_000 - 5 + i for i in range(5)]
+    assert fake_steam.count('/appreviews/') == pages + 1
+    assert list(client.get_reviews(10)) == reviews
+
+
+def test_first_review_page_shared(client, fake_steam, monkeypatch):
+    assert client.get_total_reviews(10) == 250
+    assert len(list(client.get_reviews(10))) == 250
+    # page one served both, then pages 2, 3 and the empty one
+    assert fake_steam.count('/appreviews/10') == 4
+
+    client.get_reviews.cache.cache_backend.set_meta(10, {'complete': False})
+    client.get_review_summary.cache.memory.discard('10')
+    assert len(list(client.get_reviews(10))) == 250
+    assert client.get_total_reviews(10) == 250
+    assert fake_steam.count('/appreviews/10') == 8
+
+    # a refresh looks for new reviews, page one is fetched again
+    client.get_review_summary(10, refresh=True)
+    assert len(list(client.get_reviews(10, refresh=True))) == 250
+    assert fake_steam.count('/appreviews/10') == 10
+
+    # and so is a page older than FIRST_PAGE_MAX_AGE
+    client.get_review_summary(10, refresh=True)
+    later = monotonic() + FIRST_PAGE_MAX_AGE
+    monkeypatch.setattr(steam_api.client, 'monotonic', lambda: later)
+    client.get_reviews.cache.cache_backend.set_meta(10, {'complete': False})
+    assert len(list(client.get_reviews(10))) == 250
+    assert fake_steam.count('/appreviews/10') == 15
+
+
+def test_get_app_infos(client, fake_steam):
+    assert client.get_app_info(10).id == 10
+    apps = get_app_infos(client, [10, 20, 30, 99], chunk_size=2, workers=2)
+    assert {app_id: app.id for app_id, app in apps.items()} == {10: 10, 20: 20, 30: 30}
+    assert sorted(fake_steam.requests) == ['/api/appdetails'] * 4
+    # everything is cached now, the missing app too
+    results = dict(iter_app_infos(client, [30, 99]))
+    assert results[30] == apps[30] and isinstance(results[99], NotFound)
+    assert len(fake_steam.requests) == 4
+
+
+def test_get_app_infos_fields(client, fake_steam):
+    assert client.get_app_info(10).id == 10
+    # cached and fetched apps alike come back as projections
+    apps = get_app_infos(client, [10, 20], fields={'name'})
+    assert {app_id: app.model_dump() for app_id, app in apps.items()} == {
+        10: {'name': 'Game 10'},
+        20: {'name': 'Game 20'},
+    }
+    assert client.get_app_info(20).id == 20
+    assert len(fake_steam.requests) == 2
+
+
+def test_get_all_apps(client, fake_steam, isolated_cache):
+    expected = [{'appid': app_id, 'name': f'Game {app_id}'} for app_id in (10, 20, 30)]
+    assert list(client.get_all_apps()) == expected
+    assert list(client.get_all_apps()) == expected
+    assert fake_steam.count('/ISteamApps/GetAppList/') == 1
+    assert json.loads((isolated_cache / 'all_apps.json').read_text()) == expected
+
+
+def test_conditional_requests(client, fake_steam):
+    apps = list(client.get_all_apps())
+    app = client.get_app_info(10)
+    # refreshed, but unchanged: headers only
+    assert list(client.get_all_apps(refresh=True)) == apps
+    assert client.get_app_info(10, refresh=True) == app
+    assert fake_steam.statuses[304] == 2
+    fake_steam.apps[10]['name'] = 'Renamed'
+    assert client.get_app_info(10, refresh=True).name == 'Renamed'
+    assert [app['name'] for app in client.get_all_apps(refresh=True)][0] == 'Renamed'
+    assert fake_steam.statuses[304] == 2
+
+
+async def test_async_get_app_infos(async_client, fake_steam):
+    apps = await async_client.get_app_infos([10, 20, 99])
+    assert sorted(apps) == [10, 20]
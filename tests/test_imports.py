@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.utils import report
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Cumulative import time of every module `module` pulls in, in seconds"""
+    env = {k: v for k, v in os.environ.items() if not k.startswith('STEAM_')}
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_import_needs_no_settings():
+    # no env vars, no data files: importing builds nothing
+    times = import_times('steam_api.models')
+    assert 'pydantic_settings' not in times
+
+
+@pytest.mark.benchmark
+def test_import_time():
+    rows = {}
+    for module in ('steam_api.client', 'steam_api.models'):
+        rows[module] = (min(import_times(module)[module] for _ in range(3)) * 1000,)
+    # short-lived cron and CLI runs pay it on every start
+    report('import time', ('ms',), rows)
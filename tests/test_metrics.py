@@ -0,0 +1,47 @@
+import pytest
+
+from steam_api.metrics import Registry
+
+
+def test_stats():
+    registry = Registry()
+    hits = registry.counter('hits_total', 'Hits', ('prefix',))
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    hits.labels('apps').inc()
+    hits.labels('apps').inc(2)
+    for seconds in (0.05, 0.5, 5):
+        latency.labels().observe(seconds)
+    # registered again, e.g. by a reloaded module: the first one is kept
+    assert registry.counter('hits_total', 'Hits', ('prefix',)) is hits
+    with pytest.raises(ValueError):
+        hits.labels()
+    assert registry.stats() == {
+        'hits_total': [{'prefix': 'apps', 'value': 3}],
+        'latency_seconds': [
+            {
+                'count': 3,
+                'sum': 5.55,
+                'buckets': {0.1: 1, 1.0: 2, float('inf'): 3},
+            }
+        ],
+    }
+
+
+def test_prometheus():
+    registry = Registry()
+    responses = registry.counter('responses_total', 'Responses', ('path', 'status'))
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(1.0,))
+    responses.labels('/a"b', 200).inc()
+    with latency.labels().time():
+        pass
+    assert registry.prometheus().splitlines() == [
+        '# HELP responses_total Responses',
+        '# TYPE responses_total counter',
+        'responses_total{path="/a\\"b",status="200"} 1.0',
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{le="1.0"} 1.0',
+        'latency_seconds_bucket{le="+Inf"} 1.0',
+        f'latency_seconds_sum {latency.labels().sum!r}',
+        'latency_seconds_count 1.0',
+    ]
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+from steam_api import models
+from steam_api.models import AppNameMap, Game
+from steam_api.name_index import NameIndex, normalize
+
+from tests.utils import bench_size, best_of, report
+
+APPS = [
+    {'appid': 620, 'name': 'Portal 2'},
+    {'appid': 400, 'name': 'Portal'},
+    {'appid': 1145360, 'name': 'Hades'},
+    {'appid': 1190460, 'name': 'DEATH STRANDING'},
+    {'appid': 50300, 'name': 'Pokémon: The Game'},
+    {'appid': 9000, 'name': 'portal'},
+    {'appid': 1, 'name': '   '},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    with NameIndex.build(tmp_path / 'names.idx', APPS) as index:
+        yield index
+
+
+def test_normalize():
+    assert normalize('  Pokémon:   The-Game™ ') == 'pokemon the game'
+    assert normalize('STAR WARS™ Jedi') == normalize('star wars jedi')
+
+
+def test_name_index(index, tmp_path):
+    assert len(index) == 6
+    assert index['Hades'] == 1145360
+    assert index['death stranding'] == 1190460
+    assert index['pokemon - the game'] == 50300
+    # the exact spelling wins, then the oldest app
+    assert index['portal'] == 9000
+    assert index['PORTAL'] == 400
+    assert 'Portal 3' not in index
+    with pytest.raises(KeyError):
+        index['Portal 3']  # pylint:disable=pointless-statement
+    assert list(index.prefix('Port')) == [
+        ('Portal', 400),
+        ('portal', 9000),
+        ('Portal 2', 620),
+    ]
+    assert not list(index.prefix('x'))
+    with NameIndex(tmp_path / 'names.idx') as reopened:
+        assert reopened['Portal 2'] == 620
+
+
+def test_app_name_map(tmp_path, monkeypatch):
+    # the owned 'portal' shares its name with the older 'Portal'
+    owned = Game(app_id=9000)
+    owned.name = 'portal'
+    monkeypatch.setattr(Game, 'users_games', classmethod(lambda cls, _: [owned]))
+    monkeypatch.setattr(
+        models, 'get_client', lambda: SimpleNamespace(get_all_apps=lambda: APPS)
+    )
+    corrections = tmp_path / 'corrections.yml'
+    corrections.write_text('Hades: 1\n')
+    files = tmp_path / 'names.idx', tmp_path / 'owned.idx'
+
+    names = AppNameMap(corrections, *files, steam_id=1)
+    # the library is only listed by a rebuild
+    assert names['Portal'] == 400
+    names.rebuild()
+    assert names['Portal'] == names['PORTAL'] == 9000
+    assert names['Portal 2'] == 620
+    assert names['hades'] == 1
+
+    # later processes read it from disk
+    monkeypatch.setattr(Game, 'users_games', None)
+    assert AppNameMap(corrections, *files, steam_id=1)['Portal'] == 9000
+
+
+def test_name_index_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'names.idx'
+    path.write_bytes(b'not an index')
+    with pytest.raises(ValueError):
+        NameIndex(path)
+
+
+@pytest.mark.benchmark
+def test_name_lookup_startup(tmp_path):
+    apps = [
+        {'appid': i, 'name': f'Game number {i}'} for i in range(bench_size(200_000))
+    ]
+    names = [app['name'] for app in apps[:: max(len(apps) // 100, 1)]]
+    path = tmp_path / 'names.idx'
+    NameIndex.build(path, apps).close()
+
+    # what every run paid before: the whole name -> id dict from the app list
+    def from_dict():
+        map_ = {app['name']: app['appid'] for app in apps}
+        return [map_[name] for name in names]
+
+    def from_index():
+        with NameIndex(path) as index:
+            return [index[name] for name in names]
+
+    assert from_index() == from_dict()
+    rows = {
+        'dict': (best_of(from_dict) * 1000,),
+        'index': (best_of(from_index) * 1000,),
+    }
+    report(f'start-up and {len(names)} lookups, {len(apps)} apps', ('ms',), rows)
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from steam_api.utils import iter_json_array
+
+DOCUMENT = {
+    'applist': {
+        'apps': [{'appid': i, 'name': f'Jeu n°{i}'} for i in range(50)]
+        + [12345, -2.5e-3, 'x', [1, [2]], None, True, {}]
+    }
+}
+
+
+def chunked(raw: bytes, size: int) -> list[bytes]:
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 1 << 16])
+def test_iter_json_array(size):
+    raw = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    assert (
+        list(iter_json_array(chunked(raw, size), key='apps'))
+        == DOCUMENT['applist']['apps']
+    )
+    # top-level arrays, one after another
+    raw = b'[1, 22, {"a": "]"}]\n[\n333\n]\n[]'
+    assert list(iter_json_array(chunked(raw, size))) == [1, 22, {'a': ']'}, 333]
+
+
+@pytest.mark.parametrize(
+    ('raw', 'key'),
+    [
+        (b'[1, 2', None),
+        (b'{"apps": 1}', None),
+        (b'{"games": []}', 'apps'),
+        (b'[{"a": ]', None),
+    ],
+)
+def test_iter_json_array_invalid(raw, key):
+    with pytest.raises(ValueError):
+        list(iter_json_array([raw], key=key))
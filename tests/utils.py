@@ -1,6 +1,133 @@
+import json
+import os
+import subprocess
+from inspect import isasyncgenfunction, isgeneratorfunction
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Type
+
+import pytest
 from pydantic import BaseModel
 
+from steam_api.async_client import AsyncClient
+from steam_api.cache.backends import CacheBackend
+from steam_api.cache.memory import MemoryCache
+from steam_api.cache.serializers import SerializerBase
+from steam_api.client import Client
+from steam_api.common import ROOT, AnyDict
+from steam_api.schemas import Review
+
+from tests.fake_steam import make_review
+
+BENCH_SCALE = float(os.environ.get('BENCH_SCALE', 1))
+# benchmark results of the last run, compared with on the next one
+BENCH_RESULTS = Path(os.environ.get('BENCH_RESULTS', ROOT / '.benchmarks'))
+
 
 class TestDatum(BaseModel):
     name: str
     arg: str | None = None
+
+
+def bench_size(n: int) -> int:
+    return max(int(n * BENCH_SCALE), 1)
+
+
+def best_of(func: Callable[[], object], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def report(title: str, header: tuple[str, ...], rows: dict[str, tuple]) -> None:
+    print(f'\n{title}')
+    print(' | '.join(f'{column:>12}' for column in ('', *header)))
+    for name, values in rows.items():
+        cells = [f'{v:>12,.0f}' if isinstance(v, float) else f'{v:>12}' for v in values]
+        print(' | '.join([f'{name:>12}', *cells]))
+
+
+def cached_reviews(n: int) -> list[AnyDict]:
+    """Reviews the way the cache layer stores them"""
+    return [
+        Review.model_validate(make_review(i)).model_dump(
+            by_alias=True, exclude_unset=True
+        )
+        for i in range(n)
+    ]
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(name: str, header: tuple[str, ...], rows: dict[str, tuple]) -> None:
+    """Store `rows` under `BENCH_RESULTS` and print how they changed since last run"""
+    path = BENCH_RESULTS / f'{name}.json'
+    if path.exists():
+        previous = json.loads(path.read_text())
+        changes = {
+            row: tuple(
+                f'{(new / old - 1) * 100:+.0f}%' if old else '-'
+                for new, old in zip(values, previous['rows'][row])
+            )
+            for row, values in rows.items()
+            if row in previous['rows'] and previous['header'] == list(header)
+        }
+        if changes:
+            report(f'{name}, change since {previous["revision"]}', header, changes)
+    BENCH_RESULTS.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({'revision': revision(), 'header': header, 'rows': rows}, indent=1)
+    )
+
+
+def is_stream(func: Callable) -> bool:
+    return isgeneratorfunction(func) or isasyncgenfunction(func)
+
+
+def supports_streams(backend: Type[CacheBackend]) -> bool:
+    return backend.iter_write is not CacheBackend.iter_write
+
+
+def isolate_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    path: Path,
+    backend: Type[CacheBackend] | None = None,
+    serializer: SerializerBase | None = None,
+) -> None:
+    """Point every cached client method at `path`, optionally another backend.
+
+    Streams stay on their own kind of backend if `backend` can't store them.
+    """
+    for client_class in (Client, AsyncClient):
+        for attr in vars(client_class).values():
+            decorator = getattr(attr, 'cache', None)
+            if decorator is None:
+                continue
+            original = decorator.cache_backend
+            backend_class = backend or type(original)
+            if is_stream(attr.__wrapped__) and not supports_streams(backend_class):
+                backend_class = type(original)
+            isolated = backend_class(
+                path / original.prefix, serializer or original._serializer
+            )
+            isolated.no_args_mode = original._no_args_mode
+            monkeypatch.setattr(decorator, 'cache_backend', isolated)
+            if decorator.memory is not None:
+                memory = MemoryCache(
+                    decorator.memory.max_entries, decorator.memory.max_bytes
+                )
+                monkeypatch.setattr(decorator, 'memory', memory)